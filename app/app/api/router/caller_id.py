@@ -0,0 +1,7 @@
+from django.urls import path
+from app.api.viewsets.caller_id import CallerIdView, CallerIdBatchView
+
+urlpatterns = [
+    path('caller-id', CallerIdView.as_view(), name='caller-id'),
+    path('caller-id/batch', CallerIdBatchView.as_view(), name='caller-id-batch'),
+]
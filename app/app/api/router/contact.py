@@ -1,6 +1,10 @@
 from django.urls import path
-from app.api.viewsets.contact import ContactView
+from app.api.viewsets.contact import ContactView, ContactChangesView, ContactSyncView, ContactImportView, ContactImportDetailView
 
 urlpatterns = [
     path('contact', ContactView.as_view(), name='contact'),
+    path('contact/changes', ContactChangesView.as_view(), name='contact-changes'),
+    path('contact/sync', ContactSyncView.as_view(), name='contact-sync'),
+    path('contact/import', ContactImportView.as_view(), name='contact-import'),
+    path('contact/import/<uuid:id>', ContactImportDetailView.as_view(), name='contact-import-details'),
 ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 from django.urls import path
-from app.api.viewsets.dashboard import DashboardView
+from app.api.viewsets.dashboard import DashboardView, DashboardCacheStatsView
 
 urlpatterns = [
     path('dashboard', DashboardView.as_view(), name='dashboard'),
+    path('dashboard/cache-stats', DashboardCacheStatsView.as_view(), name='dashboard-cache-stats'),
 ]
\ No newline at end of file
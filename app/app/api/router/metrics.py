@@ -0,0 +1,6 @@
+from django.urls import path
+from app.api.viewsets.metrics import MetricsView
+
+urlpatterns = [
+    path('metrics', MetricsView.as_view(), name='metrics'),
+]
@@ -5,6 +5,8 @@ from app.api.router.search import urlpatterns as searchAPI
 from app.api.router.contact import urlpatterns as contactAPI
 from app.api.router.interaction import urlpatterns as interactionAPI
 from app.api.router.dashboard import urlpatterns as dashboardAPI
+from app.api.router.caller_id import urlpatterns as callerIdAPI
+from app.api.router.metrics import urlpatterns as metricsAPI
 
 urlpatterns = [
     *userAPI,
@@ -13,4 +15,6 @@ urlpatterns = [
     *contactAPI,
     *interactionAPI,
     *dashboardAPI,
+    *callerIdAPI,
+    *metricsAPI,
 ]
\ No newline at end of file
@@ -1,33 +1,190 @@
+import base64
+import binascii
+import codecs
+import csv
+import itertools
+import json
+import uuid
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.utils.urls import replace_query_param
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.conf import settings
 from django.db import transaction, IntegrityError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from app.instrumentation import serialize
+from app.log import get_logger
+from app.models import Contact, ContactVersion, ContactTombstone, Interaction, ContactImportJob
+from app.api.viewsets.dashboard import invalidate_dashboard_cache
+from app.serializers.input.contact import (
+    CreateContactInputSerializer,
+    SyncContactsInputSerializer,
+    CreateContactImportInputSerializer,
+)
+from app.serializers.output.contact import (
+    ContactOutputSerializer,
+    ContactChangeOutputSerializer,
+    ContactTombstoneOutputSerializer,
+    ContactImportJobOutputSerializer,
+)
+
+
+log = get_logger(__name__)
+
+IMPORT_CONTENT_TYPES = {
+    'application/x-ndjson': ContactImportJob.NDJSON,
+    'application/ndjson': ContactImportJob.NDJSON,
+    'text/csv': ContactImportJob.CSV,
+}
+
+
+def iter_body_lines(request):
+    """Decoded lines of the request body, read one at a time"""
+    return codecs.iterdecode(iter(request.stream.readline, b''), 'utf-8-sig')
+
+
+def iter_ndjson_rows(lines):
+    """(row, error) pairs, a malformed line gives (None, error) instead of ending the import"""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield None, f"Line {line_number}: invalid JSON"
+            continue
+        if not isinstance(row, dict):
+            yield None, f"Line {line_number}: expected a JSON object"
+            continue
+        yield row, None
+
 
-from app.models import Contact, Interaction
-from app.serializers.input.contact import CreateContactInputSerializer
-from app.serializers.output.contact import ContactOutputSerializer
+def iter_csv_rows(lines):
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None or not {'phone_number', 'first_name'} <= set(reader.fieldnames):
+        raise ValueError("CSV header must contain phone_number and first_name")
+    for row in reader:
+        yield row, None
+
+
+def sync_batch(user, batch):
+    """Contact.objects.sync_for() on the parsed rows of a batch, with malformed rows added to its errors"""
+    indexes = [index for index, (row, error) in enumerate(batch) if error is None]
+    result = Contact.objects.sync_for(user, [batch[index][0] for index in indexes])
+    errors = [{**error, 'index': indexes[error['index']]} for error in result['errors']]
+    errors.extend(
+        {'index': index, 'phone_number': None, 'error': error}
+        for index, (row, error) in enumerate(batch) if error is not None
+    )
+    return {**result, 'errors': sorted(errors, key=lambda error: error['index'])}
+
+
+def iter_batches(rows, batch_size):
+    while batch := list(itertools.islice(rows, batch_size)):
+        yield batch
+
+
+def encode_contact_cursor(contact):
+    """Opaque keyset cursor pointing at the (created_at, id) of a contact"""
+    position = [contact.created_at.isoformat(), str(contact.id)]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_contact_cursor(cursor):
+    """Inverse of encode_contact_cursor, raises ValueError for malformed cursors"""
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = parse_datetime(created_at)
+        id = uuid.UUID(id)
+    except (TypeError, ValueError, AttributeError, binascii.Error) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+    if created_at is None:
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return created_at, id
 
 
 class ContactView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     
+    # SQL queries one request may run, including the JWT user lookup.
+    # The benchmark command reports any request that exceeds it.
+    query_budget = {'GET': 3, 'POST': 14}
+    
     def get(self, request):
-        """Get all contacts for current user"""
-        contacts = Contact.objects.filter(created_by=request.user).order_by('-created_at')
-        serializer = ContactOutputSerializer(contacts, many=True)
-        return Response(serializer.data)
+        """
+        Contacts of the current user, newest first, one page at a time
+        
+        Query Parameters:
+        - limit: Integer - Contacts per page (default CONTACTS_PAGE_SIZE, max CONTACTS_MAX_LIMIT)
+        - cursor: String - Position after the last contact of the previous page,
+          taken from the Link header of that page
+        - fields: String - Comma-separated output fields to return, e.g. phone_number,full_name
+        """
+        try:
+            limit = int(request.query_params.get('limit', settings.CONTACTS_PAGE_SIZE))
+        except ValueError:
+            return Response(
+                {'error': 'Invalid limit. Must be an integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= limit <= settings.CONTACTS_MAX_LIMIT:
+            return Response(
+                {'error': f'Invalid limit. Must be between 1 and {settings.CONTACTS_MAX_LIMIT}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        fields = None
+        if request.query_params.get('fields'):
+            fields = [field.strip() for field in request.query_params['fields'].split(',') if field.strip()]
+            unknown = set(fields) - set(ContactOutputSerializer.Meta.fields)
+            if unknown or not fields:
+                return Response(
+                    {'error': f"Invalid fields. Choose from: {', '.join(ContactOutputSerializer.Meta.fields)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        contacts = Contact.objects.filter(created_by=request.user).order_by('-created_at', '-id')
+        if fields is not None:
+            # The cursor needs created_at and id whatever the client asked for
+            contacts = contacts.only(*ContactOutputSerializer.source_fields(fields) | {'id', 'created_at'})
+        
+        # Keyset pagination, continuing after the (created_at, id) of the previous page
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                after_created_at, after_id = decode_contact_cursor(cursor)
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid cursor'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            contacts = contacts.filter(
+                Q(created_at__lt=after_created_at) | Q(created_at=after_created_at, id__lt=after_id)
+            )
+        
+        # The extra row only tells whether there is a next page
+        page = list(contacts[:limit + 1])
+        has_next = len(page) > limit
+        page = page[:limit]
+        
+        response = Response(serialize(ContactOutputSerializer(page, many=True, fields=fields)))
+        if has_next:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'cursor', encode_contact_cursor(page[-1])
+            )
+            response['Link'] = f'<{next_url}>; rel="next"'
+        return response
     
     @transaction.atomic
     def post(self, request):
         """Create a new contact"""
-        print("=" * 50)
-        print("Contact Creation Request")
-        print("User:", request.user.phone_number)
-        print("Data:", request.data)
-        print("=" * 50)
+        log.debug('contact_create_request', user_id=request.user.id, data=request.data)
         
         # Add request to context for validation
         serializer = CreateContactInputSerializer(
@@ -51,16 +208,15 @@ class ContactView(APIView):
                     }
                 )
                 
-                print("✅ Contact created successfully:", contact.phone_number)
-                print("=" * 50)
+                log.info('contact_created', user_id=request.user.id, contact_id=contact.id)
                 
                 return Response(
-                    ContactOutputSerializer(contact).data,
+                    serialize(ContactOutputSerializer(contact)),
                     status=status.HTTP_201_CREATED
                 )
             
             except IntegrityError as e:
-                print("❌ IntegrityError:", str(e))
+                log.warning('contact_create_conflict', user_id=request.user.id, error=str(e))
                 error_msg = str(e).lower()
                 if 'unique' in error_msg or 'duplicate' in error_msg:
                     return Response(
@@ -73,14 +229,236 @@ class ContactView(APIView):
                 )
             
             except Exception as e:
-                print("❌ Error creating contact:", str(e))
-                print("=" * 50)
+                log.exception('contact_create_failed', user_id=request.user.id)
                 return Response(
                     {'error': f'Failed to create contact: {str(e)}'},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
         
-        print("❌ Validation errors:", serializer.errors)
-        print("=" * 50)
+        log.info('contact_create_invalid', user_id=request.user.id, errors=serializer.errors)
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ContactChangesView(APIView):
+    """
+    GET /api/contact/changes?since=<version>
+    Contacts created, updated or deleted since a version of the address book,
+    oldest change first. since=0 (the default) returns every contact.
+    
+    Query Parameters:
+    - since: Integer - The version returned by the previous sync
+    - limit: Integer - Changes per page (default CONTACT_CHANGES_PAGE_SIZE, max CONTACT_CHANGES_MAX_LIMIT)
+    
+    Store the returned version and pass it as since next time; while has_more is
+    true, call again right away. 410 means deletes since that version were pruned
+    and the client has to start over from since=0.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    # SQL queries one request may run, including the JWT user lookup.
+    # The benchmark command reports any request that exceeds it.
+    query_budget = 5
+    
+    def get(self, request):
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = int(request.query_params.get('limit', settings.CONTACT_CHANGES_PAGE_SIZE))
+        except ValueError:
+            return Response(
+                {'error': 'since and limit must be integers.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if since < 0:
+            return Response(
+                {'error': 'Invalid since. Must be 0 or a version returned by this endpoint.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= limit <= settings.CONTACT_CHANGES_MAX_LIMIT:
+            return Response(
+                {'error': f'Invalid limit. Must be between 1 and {settings.CONTACT_CHANGES_MAX_LIMIT}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Only committed changes count up to the committed counter, so later pages can't skip any
+        current = ContactVersion.objects.filter(user=request.user).values('version', 'pruned_version').first()
+        current = current or {'version': 0, 'pruned_version': 0}
+        if 0 < since < current['pruned_version']:
+            return Response(
+                {'error': 'Deleted contacts since this version are no longer tracked, sync again from since=0.'},
+                status=status.HTTP_410_GONE
+            )
+        
+        contacts = list(
+            Contact.objects.filter(
+                created_by=request.user, version__gt=since, version__lte=current['version']
+            ).order_by('version')[:limit + 1]
+        )
+        # A client syncing from scratch has nothing to delete
+        tombstones = list(
+            ContactTombstone.objects.filter(
+                user=request.user, version__gt=since, version__lte=current['version']
+            ).order_by('version')[:limit + 1]
+        ) if since else []
+        
+        # Merge both by version and cut the page there, the next page starts after its last change
+        changes = sorted(contacts + tombstones, key=lambda change: change.version)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        version = changes[-1].version if has_more else max(current['version'], since)
+        
+        return Response({
+            'version': version,
+            'has_more': has_more,
+            'contacts': serialize(ContactChangeOutputSerializer(
+                [change for change in changes if isinstance(change, Contact)], many=True
+            )),
+            'deleted': serialize(ContactTombstoneOutputSerializer(
+                [change for change in changes if isinstance(change, ContactTombstone)], many=True
+            )),
+        })
+
+
+class ContactSyncView(APIView):
+    """
+    Bulk address-book sync: creates missing contacts and renames changed ones
+    in one transaction, reporting invalid entries per index
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = SyncContactsInputSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = Contact.objects.sync_for(request.user, serializer.validated_data['contacts'])
+        # bulk_create() sends no post_save, so drop the cached dashboard here
+        invalidate_dashboard_cache([request.user.id])
+        return Response(result, status=status.HTTP_200_OK)
+
+
+def upload_error(request, import_format=None):
+    """Response rejecting an import upload that can't be streamed, else None"""
+    content_type = request.content_type.split(';')[0].strip().lower()
+    type_format = IMPORT_CONTENT_TYPES.get(content_type)
+    if type_format is None or import_format not in (None, type_format):
+        types = [name for name, type_format in IMPORT_CONTENT_TYPES.items() if import_format in (None, type_format)]
+        return Response(
+            {'error': f"Unsupported content type, use one of: {', '.join(types)}"},
+            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
+    
+    # No stream means no body to read, or a chunked upload without Content-Length
+    if request.stream is None:
+        if not request.META.get('CONTENT_LENGTH'):
+            return Response(
+                {'error': 'Content-Length header is required'},
+                status=status.HTTP_411_LENGTH_REQUIRED
+            )
+        return Response(
+            {'error': 'Request body is empty'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return None
+
+
+def run_import(request, job, success_status=status.HTTP_200_OK):
+    """Stream the request body into the running job's contacts, returns the finished job's response"""
+    lines = iter_body_lines(request)
+    rows = iter_ndjson_rows(lines) if job.format == ContactImportJob.NDJSON else iter_csv_rows(lines)
+    
+    # Each batch commits on its own, so a failure keeps the batches before it
+    try:
+        for batch in iter_batches(rows, settings.CONTACT_IMPORT_BATCH_SIZE):
+            job.record_batch(len(batch), sync_batch(request.user, batch))
+            invalidate_dashboard_cache([request.user.id])
+    except (ValueError, csv.Error) as e:
+        job.finish(ContactImportJob.FAILED, str(e))
+        return Response(serialize(ContactImportJobOutputSerializer(job)), status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        job.finish(ContactImportJob.FAILED, f'Import failed: {str(e)}')
+        raise
+    
+    job.finish(ContactImportJob.COMPLETED)
+    return Response(serialize(ContactImportJobOutputSerializer(job)), status=success_status)
+
+
+class ContactImportView(APIView):
+    """
+    Streamed contact import. The NDJSON or CSV body is parsed line by line and
+    committed every CONTACT_IMPORT_BATCH_SIZE rows, never loading the whole upload.
+    To poll progress, create the job first with a JSON {"format": ...} body and
+    PUT the upload to /api/contact/import/<id>; a direct upload here only
+    returns the job once it finished.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Recent imports of the current user, for polling progress"""
+        jobs = ContactImportJob.objects.filter(created_by=request.user)[:20]
+        return Response(serialize(ContactImportJobOutputSerializer(jobs, many=True)))
+    
+    def post(self, request):
+        content_type = request.content_type.split(';')[0].strip().lower()
+        if content_type == 'application/json':
+            serializer = CreateContactImportInputSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            job = ContactImportJob.objects.create(
+                created_by=request.user,
+                format=serializer.validated_data['format'],
+                status=ContactImportJob.PENDING,
+            )
+            return Response(serialize(ContactImportJobOutputSerializer(job)), status=status.HTTP_201_CREATED)
+        
+        error = upload_error(request)
+        if error is not None:
+            return error
+        
+        job = ContactImportJob.objects.create(created_by=request.user, format=IMPORT_CONTENT_TYPES[content_type])
+        return run_import(request, job, success_status=status.HTTP_201_CREATED)
+
+
+class ContactImportDetailView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, id):
+        """Progress of one import"""
+        try:
+            job = ContactImportJob.objects.get(id=id, created_by=request.user)
+        except ContactImportJob.DoesNotExist:
+            return Response(
+                {'error': 'Import not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(serialize(ContactImportJobOutputSerializer(job)))
+    
+    def put(self, request, id):
+        """Upload the body of a pending import, which GET shows progressing meanwhile"""
+        try:
+            job = ContactImportJob.objects.get(id=id, created_by=request.user)
+        except ContactImportJob.DoesNotExist:
+            return Response(
+                {'error': 'Import not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        error = upload_error(request, job.format)
+        if error is not None:
+            return error
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        # Claimed atomically, so two uploads can't run the same job
+        claimed = ContactImportJob.objects.filter(pk=job.pk, status=ContactImportJob.PENDING).update(
+            status=ContactImportJob.RUNNING
+        )
+        if not claimed:
+            return Response(
+                {'error': f'Import is already {job.status}'},
+                status=status.HTTP_409_CONFLICT
+            )
+        job.status = ContactImportJob.RUNNING
+        return run_import(request, job)
@@ -1,16 +1,59 @@
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.response import Response
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import HttpResponseNotModified
 from django.shortcuts import render
+from app import metrics
 from app.models.interaction import Interaction
+from app.models.interaction_rollup import InteractionRollup
 from app.models.scam import ScamRecord
-from app.models.user import User
-from django.db.models import Count, Q
-from datetime import datetime, timedelta
+from app.models.scam_aggregate import ScamAggregate
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from datetime import timedelta
+import hashlib
 import json
 
 
+def dashboard_cache_key(user_id):
+    return f'dashboard:{user_id}'
+
+
+def invalidate_dashboard_cache(user_ids):
+    """Drop the cached dashboards of the given users once the current transaction commits"""
+    keys = [dashboard_cache_key(user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _count_dashboard_cache_lookup(hit):
+    metrics.count_cache_lookups('dashboard', hits=int(hit), misses=int(not hit))
+    # Counters live in the cache itself, so every worker sharing the backend adds to them
+    key = 'dashboard:stats:hits' if hit else 'dashboard:stats:misses'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def dashboard_cache_stats():
+    """Dashboard cache hits, misses and hit ratio since the counters were created"""
+    hits = cache.get('dashboard:stats:hits', 0)
+    misses = cache.get('dashboard:stats:misses', 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+    }
+
+
 class DashboardView(APIView):
     """
     GET /api/dashboard
@@ -18,51 +61,74 @@ class DashboardView(APIView):
     """
     permission_classes = (IsAuthenticated,)
     authentication_classes = (JWTAuthentication,)
+    
+    # SQL queries one request may run, including the JWT user lookup.
+    # The benchmark command reports any request that exceeds it.
+    query_budget = 9
 
     def get(self, request):
         user = request.user
         
         # Check if request wants HTML or JSON
         accept_header = request.META.get('HTTP_ACCEPT', '')
+        wants_html = 'text/html' in accept_header or request.query_params.get('format') == 'html'
+        
+        data, digest, cache_status = self._get_cached_dashboard_data(user)
+        etag = f'"{digest}-{"html" if wants_html else "json"}"'
         
-        if 'text/html' in accept_header or request.query_params.get('format') == 'html':
+        # Repeated refreshes of an unchanged dashboard only get the ETag back
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+        if if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]:
+            response = HttpResponseNotModified()
+        elif wants_html:
             # Return HTML dashboard
-            context = self._get_dashboard_data(user)
+            context = dict(data)
             # Convert activity_trend to JSON string for JavaScript
             context['activity_trend'] = json.dumps(context['activity_trend'])
-            return render(request, 'dashboard.html', context)
+            response = render(request, 'dashboard.html', context)
         else:
             # Return JSON data
-            data = self._get_dashboard_data(user)
-            return Response(data, status=200)
+            response = Response(data, status=200)
+        
+        response['ETag'] = etag
+        response['X-Cache'] = cache_status
+        return response
+    
+    def _get_cached_dashboard_data(self, user):
+        """
+        Dashboard data of a user, cached for DASHBOARD_CACHE_TIMEOUT and dropped
+        as soon as an interaction or spam report touching the user is written.
+        Returns (data, digest of data, 'HIT' or 'MISS').
+        """
+        key = dashboard_cache_key(user.id)
+        cached = cache.get(key)
+        _count_dashboard_cache_lookup(cached is not None)
+        if cached is not None:
+            return cached['data'], cached['digest'], 'HIT'
+        
+        data = self._get_dashboard_data(user)
+        digest = hashlib.md5(json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+        cache.set(key, {'data': data, 'digest': digest}, settings.DASHBOARD_CACHE_TIMEOUT)
+        return data, digest, 'MISS'
     
     def _get_dashboard_data(self, user):
         """Gather all dashboard statistics"""
+        rollups = InteractionRollup.objects.filter(user=user)
         
-        # Total interactions
-        total_interactions = Interaction.objects.filter(
-            Q(initiator=user) | Q(receiver=user)
-        ).count()
-        
-        # Interactions by type
-        interactions_by_type = Interaction.objects.filter(
-            Q(initiator=user) | Q(receiver=user)
-        ).values('interaction_type').annotate(count=Count('id'))
-        
+        # Total and per-type counts from the daily rollups, one row per day/type/direction
+        totals = rollups.aggregate(
+            total=Coalesce(Sum('count'), 0),
+            calls=Coalesce(Sum('count', filter=Q(interaction_type='call')), 0),
+            messages=Coalesce(Sum('count', filter=Q(interaction_type='message')), 0),
+            spam_reports=Coalesce(Sum('count', filter=Q(interaction_type='spam_report')), 0),
+        )
+        total_interactions = totals['total']
         interaction_stats = {
-            'calls': 0,
-            'messages': 0,
-            'spam_reports': 0
+            'calls': totals['calls'],
+            'messages': totals['messages'],
+            'spam_reports': totals['spam_reports']
         }
         
-        for stat in interactions_by_type:
-            if stat['interaction_type'] == 'call':
-                interaction_stats['calls'] = stat['count']
-            elif stat['interaction_type'] == 'message':
-                interaction_stats['messages'] = stat['count']
-            elif stat['interaction_type'] == 'spam_report':
-                interaction_stats['spam_reports'] = stat['count']
-        
         # Recent interactions (last 10)
         recent_interactions = Interaction.objects.filter(
             Q(initiator=user) | Q(receiver=user)
@@ -70,58 +136,45 @@ class DashboardView(APIView):
         
         recent_list = []
         for interaction in recent_interactions:
-            other_user = interaction.receiver if interaction.initiator == user else interaction.initiator
+            is_outgoing = interaction.initiator_id == user.id
+            other_user = interaction.receiver if is_outgoing else interaction.initiator
             recent_list.append({
                 'type': interaction.interaction_type,
                 'with': other_user.get_full_name() if other_user else interaction.receiver_phone,
                 'date': interaction.created_at.strftime('%Y-%m-%d %H:%M'),
-                'direction': 'outgoing' if interaction.initiator == user else 'incoming'
+                'direction': 'outgoing' if is_outgoing else 'incoming'
             })
         
-        # Top contacts (most interacted)
-        top_contacts_data = Interaction.objects.filter(
-            initiator=user
-        ).values('receiver_phone').annotate(
-            count=Count('id')
-        ).order_by('-count')[:5]
-        
-        top_contacts = []
-        for contact in top_contacts_data:
-            phone = contact['receiver_phone']
-            receiver = User.objects.filter(phone_number=phone).first()
-            top_contacts.append({
-                'name': receiver.get_full_name() if receiver else phone,
-                'phone': phone,
-                'count': contact['count']
-            })
+        # Top contacts (most interacted), names resolved in batched lookups
+        top_contacts = [
+            {'name': contact['name'], 'phone': contact['phone'], 'count': contact['count']}
+            for contact in Interaction.objects.top_contacts_for(user, 5)
+        ]
         
         # Spam reports received (how many times this user was reported)
-        spam_received = ScamRecord.objects.filter(
-            phone_number=user.phone_number
-        ).count()
+        spam_received = ScamAggregate.objects.count_for(user.phone_number)
         
         # Spam reports made by this user
         spam_reported = ScamRecord.objects.filter(
             reported_by=user
         ).count()
         
-        # Activity trends (last 7 days)
+        # Activity trends (last 7 days) from the same rollups
+        today = timezone.localdate()
+        daily_counts = dict(
+            rollups.filter(day__gte=today - timedelta(days=6))
+            .values('day')
+            .annotate(count=Sum('count'))
+            .values_list('day', 'count')
+        )
+        
         activity_trend = []
         for i in range(6, -1, -1):
-            date = datetime.now() - timedelta(days=i)
-            day_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + timedelta(days=1)
-            
-            count = Interaction.objects.filter(
-                Q(initiator=user) | Q(receiver=user),
-                created_at__gte=day_start,
-                created_at__lt=day_end
-            ).count()
-            
+            date = today - timedelta(days=i)
             activity_trend.append({
                 'date': date.strftime('%Y-%m-%d'),
                 'day': date.strftime('%a'),
-                'count': count
+                'count': daily_counts.get(date, 0)
             })
         
         return {
@@ -139,4 +192,16 @@ class DashboardView(APIView):
                 'reported': spam_reported
             },
             'activity_trend': activity_trend
-        }
\ No newline at end of file
+        }
+
+
+class DashboardCacheStatsView(APIView):
+    """
+    GET /api/dashboard/cache-stats
+    Hit ratio of the dashboard response cache (staff only)
+    """
+    permission_classes = (IsAdminUser,)
+    authentication_classes = (JWTAuthentication,)
+
+    def get(self, request):
+        return Response(dashboard_cache_stats())
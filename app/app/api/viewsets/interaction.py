@@ -4,11 +4,18 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Count, Q
-from datetime import datetime, timedelta
+from rest_framework.utils.urls import replace_query_param
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import RowNumber
+from datetime import datetime, time, timedelta
+import base64
+import binascii
+import json
+from app.instrumentation import serialize
 from app.models.interaction import Interaction
 from app.models.scam import ScamRecord
-from app.models import User
+from app.models.spam_leaderboard import SpamLeaderboardEntry, SpamLeaderboardWatermark
 from app.serializers.input.interaction import CreateInteractionInputSerializer
 from app.serializers.output.interaction import InteractionOutputSerializer
 
@@ -26,7 +33,7 @@ class InteractionView(APIView):
         if serializer.is_valid():
             interaction = serializer.save(initiator=request.user)
             output_serializer = InteractionOutputSerializer(interaction)
-            return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+            return Response(serialize(output_serializer), status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -65,7 +72,7 @@ class RecentInteractionsView(APIView):
         # Serialize
         serializer = InteractionOutputSerializer(paginated_queryset, many=True)
         
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(serialize(serializer))
 
 
 class TopContactsView(APIView):
@@ -75,6 +82,10 @@ class TopContactsView(APIView):
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    
+    # SQL queries one request may run, including the JWT user lookup.
+    # The benchmark command reports any request that exceeds it.
+    query_budget = 4
 
     def get(self, request):
         # Get limit from query params (default 5, max 50)
@@ -87,51 +98,36 @@ class TopContactsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Aggregate interactions by contact
-        top_contacts = Interaction.objects.filter(
-            initiator=request.user
-        ).values('receiver_phone').annotate(
-            interaction_count=Count('id')
-        ).order_by('-interaction_count')[:limit]
-        
-        # Enrich with contact details
-        results = []
-        for contact in top_contacts:
-            phone = contact['receiver_phone']
-            count = contact['interaction_count']
-            
-            # Try to find registered user first
-            user = User.objects.filter(phone_number=phone).first()
-            if user:
-                results.append({
-                    'contact_name': user.get_full_name(),
-                    'contact_phone': phone,
-                    'interaction_count': count,
-                    'is_registered': True
-                })
-            else:
-                # Check if it's in user's contacts
-                from app.models.contact import Contact
-                contact_obj = Contact.objects.filter(
-                    created_by=request.user,
-                    phone_number=phone
-                ).first()
-                
-                if contact_obj:
-                    name = f"{contact_obj.first_name} {contact_obj.last_name}".strip()
-                else:
-                    name = phone
-                
-                results.append({
-                    'contact_name': name,
-                    'contact_phone': phone,
-                    'interaction_count': count,
-                    'is_registered': False
-                })
+        # Aggregate interactions by contact, enriched with batched user and contact lookups
+        results = [
+            {
+                'contact_name': contact['name'],
+                'contact_phone': contact['phone'],
+                'interaction_count': contact['count'],
+                'is_registered': contact['is_registered']
+            }
+            for contact in Interaction.objects.top_contacts_for(request.user, limit)
+        ]
         
         return Response(results)
 
 
+def encode_spam_stats_cursor(spam_count, phone_number):
+    """Opaque keyset cursor pointing at the (spam_count, phone_number) of a spam stats row"""
+    return base64.urlsafe_b64encode(json.dumps([spam_count, phone_number]).encode()).decode()
+
+
+def decode_spam_stats_cursor(cursor):
+    """Inverse of encode_spam_stats_cursor, raises ValueError for malformed cursors"""
+    try:
+        spam_count, phone_number = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+    if not isinstance(spam_count, int) or not isinstance(phone_number, str):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return spam_count, phone_number
+
+
 class SpamStatsView(APIView):
     """
     API endpoint to get aggregated spam statistics
@@ -142,9 +138,19 @@ class SpamStatsView(APIView):
     - end_date: ISO format (YYYY-MM-DD) - Filter reports until this date
     - min_reports: Integer - Only show numbers with at least this many reports
     - phone_number: String - Get stats for specific phone number only
+    - limit: Integer - Numbers per page (default SPAM_STATS_PAGE_SIZE, max SPAM_STATS_MAX_LIMIT)
+    - cursor: String - Position after the last number of the previous page,
+      taken from the Link header of that page
+    
+    Without phone_number, and with whole-day dates, the numbers are read from the
+    spam leaderboard, which is as fresh as the last refresh_spam_leaderboard run.
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    
+    # SQL queries one request may run, including the JWT user lookup.
+    # The benchmark command reports any request that exceeds it.
+    query_budget = 5
 
     def get(self, request):
         # Base queryset
@@ -167,6 +173,7 @@ class SpamStatsView(APIView):
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
         
+        start = end = None
         if start_date:
             try:
                 start = datetime.fromisoformat(start_date)
@@ -189,46 +196,116 @@ class SpamStatsView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
         
-        # Aggregate spam reports per phone number
-        spam_stats = queryset.values('phone_number').annotate(
-            spam_count=Count('id'),
-            unique_reporters=Count('reported_by', distinct=True)
-        ).order_by('-spam_count')
+        try:
+            limit = int(request.query_params.get('limit', settings.SPAM_STATS_PAGE_SIZE))
+        except ValueError:
+            return Response(
+                {'error': 'Invalid limit. Must be an integer.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= limit <= settings.SPAM_STATS_MAX_LIMIT:
+            return Response(
+                {'error': f'Invalid limit. Must be between 1 and {settings.SPAM_STATS_MAX_LIMIT}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Convert to list for filtering
-        spam_list = list(spam_stats)
+        # The leaderboard holds whole local days, so times and other zones need the raw reports
+        watermark = None
+        whole_days = (start is None or (start.tzinfo is None and start.time() == time.min)) and (
+            end is None or end.tzinfo is None
+        )
+        if not phone_number and whole_days:
+            watermark = SpamLeaderboardWatermark.objects.filter(pk=1, processed_until__isnull=False).first()
         
-        # Filter by minimum reports if specified
+        if watermark is not None:
+            # Sum the few day/week/month buckets covering the range instead of scanning the reports
+            entries = SpamLeaderboardEntry.objects.filter(SpamLeaderboardEntry.objects.bucket_filter(
+                start.date() if start else None, end.date() if end else None
+            ))
+            spam_stats = entries.values('phone_number').annotate(
+                reports=Sum('spam_count'),
+                reporters=Sum('unique_reporters')
+            )
+            latest_reports = entries.annotate(
+                recency=Window(RowNumber(), partition_by=F('phone_number'), order_by=F('latest_report_at').desc())
+            ).filter(recency=1).values(
+                'phone_number', created_at=F('latest_report_at'), description=F('latest_description')
+            )
+            # Reporter lists stop where the leaderboard does, so they match its counts
+            queryset = queryset.filter(watermark.includes())
+        else:
+            # Aggregate spam reports per phone number
+            spam_stats = queryset.values('phone_number').annotate(
+                reports=Count('id'),
+                reporters=Count('reported_by', distinct=True)
+            )
+            latest_reports = queryset.annotate(
+                recency=Window(RowNumber(), partition_by=F('phone_number'), order_by=F('created_at').desc())
+            ).filter(recency=1).values('phone_number', 'created_at', 'description')
+        spam_stats = spam_stats.order_by('-reports', 'phone_number')
+        
+        # Filter by minimum reports if specified (HAVING, not in Python)
         min_reports = request.query_params.get('min_reports')
         if min_reports:
             try:
-                min_reports = int(min_reports)
-                spam_list = [s for s in spam_list if s['spam_count'] >= min_reports]
+                spam_stats = spam_stats.filter(reports__gte=int(min_reports))
             except ValueError:
                 return Response(
                     {'error': 'Invalid min_reports. Must be an integer.'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
         
-        # Get detailed reporter info for each phone
+        # Keyset pagination, continuing after the (spam_count, phone_number) of the previous page
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                after_count, after_phone = decode_spam_stats_cursor(cursor)
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid cursor'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            spam_stats = spam_stats.filter(
+                Q(reports__lt=after_count) | Q(reports=after_count, phone_number__gt=after_phone)
+            )
+        
+        # The extra row only tells whether there is a next page
+        spam_list = list(spam_stats[:limit + 1])
+        has_next = len(spam_list) > limit
+        spam_list = spam_list[:limit]
+        
+        # Reporters and latest report of the whole page, one query each
+        phones = [stat['phone_number'] for stat in spam_list]
+        page_reports = queryset.filter(phone_number__in=phones)
+        
+        reporters = {phone: [] for phone in phones}
+        for phone, reporter_id in page_reports.values_list('phone_number', 'reported_by_id').distinct():
+            reporters[phone].append(reporter_id)
+        
+        latest_reports = {
+            report['phone_number']: report
+            for report in latest_reports.filter(phone_number__in=phones)
+        }
+        
         results = []
         for stat in spam_list:
             phone = stat['phone_number']
-            
-            # Get all reporters for this phone number
-            phone_reports = queryset.filter(phone_number=phone)
-            reporters = phone_reports.values_list('reported_by_id', flat=True).distinct()
-            
-            # Get most recent report
-            latest_report = phone_reports.order_by('-created_at').first()
+            latest_report = latest_reports.get(phone)
             
             results.append({
                 'phone_number': phone,
-                'spam_count': stat['spam_count'],
-                'unique_reporters': stat['unique_reporters'],
-                'reported_by_users': list(reporters),
-                'latest_report_date': latest_report.created_at.isoformat() if latest_report else None,
-                'latest_description': latest_report.description if latest_report else None
+                'spam_count': stat['reports'],
+                'unique_reporters': stat['reporters'],
+                'reported_by_users': reporters[phone],
+                'latest_report_date': latest_report['created_at'].isoformat() if latest_report else None,
+                'latest_description': latest_report['description'] if latest_report else None
             })
         
-        return Response(results)
\ No newline at end of file
+        response = Response(results)
+        if has_next:
+            last = spam_list[-1]
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'cursor', encode_spam_stats_cursor(last['reports'], last['phone_number'])
+            )
+            response['Link'] = f'<{next_url}>; rel="next"'
+        return response
@@ -0,0 +1,32 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import BasePermission
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.conf import settings
+from django.http import HttpResponse
+
+from app.metrics import REGISTRY
+
+
+class IsMetricsScraper(BasePermission):
+    """Requests from METRICS_ALLOWED_IPS, or from staff users"""
+
+    def has_permission(self, request, view):
+        if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+            return True
+        return bool(request.user and request.user.is_staff)
+
+
+class MetricsView(APIView):
+    """
+    GET /api/metrics
+    Request, cache and phone normalization metrics in the Prometheus text format
+    """
+    permission_classes = (IsMetricsScraper,)
+    authentication_classes = (JWTAuthentication,)
+
+    # SQL queries one request may run, including the JWT user lookup.
+    # The benchmark command reports any request that exceeds it.
+    query_budget = 1
+
+    def get(self, request):
+        return HttpResponse(REGISTRY.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from app.instrumentation import serialize
 from app.serializers import input, output
 from app.models.scam import ScamRecord
 from app.models.interaction import Interaction
@@ -17,6 +18,10 @@ class CreateScamRecord(APIView):
     """
     permission_classes = (IsAuthenticated,)
     authentication_classes = (JWTAuthentication,)
+    
+    # SQL queries one request may run, including the JWT user lookup.
+    # The benchmark command reports any request that exceeds it.
+    query_budget = 16
 
     input_serializer_class = input.CreateScamRecordInputSerializer
     output_serializer_class = output.ScamRecordOutputSerializer
@@ -49,7 +54,7 @@ class CreateScamRecord(APIView):
                 )
                 
                 output_serializer = self.output_serializer_class(scam)
-                return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+                return Response(serialize(output_serializer), status=status.HTTP_201_CREATED)
                 
             except Exception as e:
                 return Response(
@@ -1,21 +1,130 @@
+import base64
+import binascii
+import hashlib
+import json
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.utils.urls import replace_query_param
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.db.models import Q, Count
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, FloatField, ExpressionWrapper, Value, When
+from django.db.models.functions import Concat, Least, Length, Trim
 from fuzzywuzzy import fuzz
 
-from app.models import User, Contact, ScamRecord
+from app import metrics
+from app.models import User, Contact, ScamAggregate, NameIndexEntry, NameConsensus
 from app.serializers.output.user import UserOutputSerializer
 from app.serializers.output.contact import ContactOutputSerializer
-from app.utils import normalize_phone_number
+from app.utils import normalize_phone_number, TopMatches
+
+
+def match_score_ceiling(query_length):
+    """
+    Highest fuzz.ratio a full name can reach against a query of the given length.
+    At most min(name, query) characters can match, so the ratio is bounded by
+    200 * min / (name length + query length).
+    """
+    name_length = Length(Trim(Concat('first_name', Value(' '), 'last_name')))
+    return ExpressionWrapper(
+        Value(200.0) * Least(name_length, Value(query_length)) / (name_length + Value(query_length)),
+        output_field=FloatField(),
+    )
+
+
+def rank_name_matches(query, top_matches):
+    """
+    Fuzzy-score the trigram-index candidates of a name query into top_matches.
+    Rows are fetched best possible score first, and each type stops as soon as
+    no remaining row can enter top_matches.
+    """
+    candidate_limit = settings.SEARCH_CANDIDATE_LIMIT
+    query_lower = query.lower()
+    
+    # Users go first so they win ties against contacts with the same number
+    for entity_type, model, is_registered in (
+        (NameIndexEntry.USER, User, True),
+        (NameIndexEntry.CONTACT, Contact, False),
+    ):
+        candidate_ids = [
+            candidate['entity_id']
+            for candidate in NameIndexEntry.objects.candidates(query, entity_type, candidate_limit)
+        ]
+        if not candidate_ids:
+            continue
+
+        rows = (
+            model.objects.filter(id__in=candidate_ids)
+            .annotate(max_match_score=match_score_ceiling(len(query_lower)))
+            .order_by('-max_match_score', '-phone_number')
+            .values_list('id', 'first_name', 'last_name', 'phone_number', 'max_match_score')
+        )
+
+        for id, first_name, last_name, phone_number, max_match_score in rows.iterator(
+            chunk_size=settings.SEARCH_FETCH_CHUNK_SIZE
+        ):
+            min_rank = top_matches.min_rank()
+            if min_rank is not None and (round(max_match_score), is_registered) < min_rank[:2]:
+                break
+
+            name = f"{first_name} {last_name}".strip()
+            if is_registered:
+                name = name or phone_number  # Same fallback as User.get_full_name
+
+            top_matches.push({
+                'id': str(id),
+                'name': name,
+                'phone_number': phone_number,
+                'is_registered': is_registered,
+                'match_score': fuzz.ratio(query_lower, name.lower()),
+                'type': entity_type
+            })
+
+
+def ranked_name_matches(query):
+    """
+    Every deduplicated candidate of a name query, best first.
+    Cached for SEARCH_CACHE_TIMEOUT so paging through a query scores it only once.
+    """
+    cache_key = 'search:names:' + hashlib.md5(query.lower().encode()).hexdigest()
+    ranked = cache.get(cache_key)
+    metrics.count_cache_lookups('search_names', hits=int(ranked is not None), misses=int(ranked is None))
+    if ranked is None:
+        top_matches = TopMatches(2 * settings.SEARCH_CANDIDATE_LIMIT)
+        rank_name_matches(query, top_matches)
+        ranked = top_matches.results()
+        cache.set(cache_key, ranked, settings.SEARCH_CACHE_TIMEOUT)
+    return ranked
+
+
+def encode_search_cursor(result):
+    """Opaque keyset cursor pointing at (match_score, is_registered, phone_number) of a result"""
+    position = [result['match_score'], result['is_registered'], result['phone_number']]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_search_cursor(cursor):
+    """Inverse of encode_search_cursor, raises ValueError for malformed cursors"""
+    try:
+        match_score, is_registered, phone_number = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+    if not isinstance(match_score, int) or not isinstance(is_registered, bool) or not isinstance(phone_number, str):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return {'match_score': match_score, 'is_registered': is_registered, 'phone_number': phone_number}
 
 
 class SearchView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     
+    # SQL queries one request may run, including the JWT user lookup.
+    # The benchmark command reports any request that exceeds it.
+    query_budget = 6
+    
     def get(self, request):
         query = request.query_params.get('q', '').strip()
         
@@ -29,16 +138,17 @@ class SearchView(APIView):
         is_phone_search = query.replace('+', '').replace(' ', '').replace('-', '').isdigit()
         
         results = []
+        next_url = None
         
         if is_phone_search:
             # Phone number search (exact match)
             try:
                 normalized_phone = normalize_phone_number(query)
+                spam_count = ScamAggregate.objects.count_for(normalized_phone)
                 
                 # Search users
                 users = User.objects.filter(phone_number=normalized_phone)
                 for user in users:
-                    spam_count = ScamRecord.objects.filter(phone_number=normalized_phone).count()
                     results.append({
                         'id': str(user.id),
                         'name': user.get_full_name(),
@@ -48,19 +158,27 @@ class SearchView(APIView):
                         'match_score': 100
                     })
                 
-                # Search contacts if no user found
+                # Otherwise one answer from the name consensus of everyone's contacts
                 if not users:
-                    contacts = Contact.objects.filter(phone_number=normalized_phone)
-                    for contact in contacts:
-                        spam_count = ScamRecord.objects.filter(phone_number=normalized_phone).count()
-                        results.append({
-                            'id': str(contact.id),
-                            'name': f"{contact.first_name} {contact.last_name}".strip(),
-                            'phone_number': contact.phone_number,
-                            'is_registered': False,
-                            'spam_likelihood': spam_count,
-                            'match_score': 100
-                        })
+                    consensus = NameConsensus.objects.filter(phone_number=normalized_phone).first()
+                    if consensus:
+                        # A contact saved under the best name, so /api/search/detail can follow the result
+                        contact_id = Contact.objects.filter(phone_number=normalized_phone).annotate(
+                            full_name=Trim(Concat('first_name', Value(' '), 'last_name'))
+                        ).order_by(
+                            Case(When(full_name=consensus.best_name, then=0), default=1), 'created_at', 'id'
+                        ).values_list('id', flat=True).first()
+                        if contact_id is not None:
+                            results.append({
+                                'id': str(contact_id),
+                                'name': consensus.best_name,
+                                'phone_number': consensus.phone_number,
+                                'is_registered': False,
+                                'spam_likelihood': spam_count,
+                                'match_score': 100,
+                                'confidence': consensus.confidence,
+                                'names': consensus.top_names()
+                            })
             
             except Exception as e:
                 return Response(
@@ -70,67 +188,49 @@ class SearchView(APIView):
         
         else:
             # Name search (fuzzy match)
-            # Search users
-            users = User.objects.filter(
-                Q(first_name__icontains=query) | Q(last_name__icontains=query)
-            )
-            
-            for user in users:
-                name = user.get_full_name()
-                match_score = fuzz.ratio(query.lower(), name.lower())
-                spam_count = ScamRecord.objects.filter(phone_number=user.phone_number).count()
-                
-                results.append({
-                    'id': str(user.id),
-                    'name': name,
-                    'phone_number': user.phone_number,
-                    'is_registered': True,
-                    'spam_likelihood': spam_count,
-                    'match_score': match_score,
-                    'type': 'user'
-                })
-            
-            # Search contacts
-            contacts = Contact.objects.filter(
-                Q(first_name__icontains=query) | Q(last_name__icontains=query)
-            )
-            
-            for contact in contacts:
-                name = f"{contact.first_name} {contact.last_name}".strip()
-                match_score = fuzz.ratio(query.lower(), name.lower())
-                spam_count = ScamRecord.objects.filter(phone_number=contact.phone_number).count()
-                
-                results.append({
-                    'id': str(contact.id),
-                    'name': name,
-                    'phone_number': contact.phone_number,
-                    'is_registered': False,
-                    'spam_likelihood': spam_count,
-                    'match_score': match_score,
-                    'type': 'contact'
-                })
+            cursor = request.query_params.get('cursor')
+            page_size = settings.PAGINATE_BY
             
-            # Sort by match score
-            results.sort(key=lambda x: x['match_score'], reverse=True)
+            if cursor:
+                # Later pages slice the cached full ranking after the cursor position
+                try:
+                    after = TopMatches.rank(decode_search_cursor(cursor))
+                except ValueError:
+                    return Response(
+                        {'error': 'Invalid cursor'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                ranked = ranked_name_matches(query)
+                start = next(
+                    (index for index, result in enumerate(ranked) if TopMatches.rank(result) < after),
+                    len(ranked)
+                )
+                results = [dict(result) for result in ranked[start:start + page_size + 1]]
+            else:
+                # The first page only needs the best page_size + 1 matches
+                top_matches = TopMatches(page_size + 1)
+                rank_name_matches(query, top_matches)
+                results = top_matches.results()
             
-            # Deduplicate - prioritize users over contacts
-            seen_phones = set()
-            deduplicated = []
+            # The extra result only tells whether there is a next page
+            if len(results) > page_size:
+                results = results[:page_size]
+                next_url = replace_query_param(
+                    request.build_absolute_uri(), 'cursor', encode_search_cursor(results[-1])
+                )
             
+            # Look up spam counts for the kept results only
+            spam_counts = ScamAggregate.objects.counts_for(result['phone_number'] for result in results)
             for result in results:
-                phone = result['phone_number']
-                if phone not in seen_phones:
-                    seen_phones.add(phone)
-                    deduplicated.append(result)
-            
-            results = deduplicated
+                result['spam_likelihood'] = spam_counts[result['phone_number']]
         
-        # Limit to 10 results
-        results = results[:10]
+        # Limit to one page of results
+        results = results[:settings.PAGINATE_BY]
         
         return Response({
             'results': results,
-            'count': len(results)
+            'count': len(results),
+            'next': next_url
         })
 
 
@@ -138,13 +238,17 @@ class SearchDetailsView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     
+    # SQL queries one request may run, including the JWT user lookup.
+    # The benchmark command reports any request that exceeds it.
+    query_budget = 4
+    
     def get(self, request, id):
         """Get detailed information about a search result"""
         
         # Try to find as user first
         try:
             user = User.objects.get(id=id)
-            spam_count = ScamRecord.objects.filter(phone_number=user.phone_number).count()
+            spam_count = ScamAggregate.objects.count_for(user.phone_number)
             
             # Check if requester has this user in contacts
             has_in_contacts = Contact.objects.filter(
@@ -167,7 +271,7 @@ class SearchDetailsView(APIView):
         # Try to find as contact
         try:
             contact = Contact.objects.get(id=id)
-            spam_count = ScamRecord.objects.filter(phone_number=contact.phone_number).count()
+            spam_count = ScamAggregate.objects.count_for(contact.phone_number)
             
             return Response({
                 'id': str(contact.id),
@@ -3,48 +3,47 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from app.instrumentation import serialize
+from app.log import get_logger
 from app.models import User
 from app.serializers.input.user import CreateUserInputSerializer, LoginUserInputSerializer
 from app.serializers.output.user import UserOutputSerializer
 
 
+log = get_logger(__name__)
+
+
 class UserSignupView(APIView):
     authentication_classes = []  # Disable authentication
     permission_classes = []      # Disable permissions
     
     def post(self, request):
-        print("=" * 50)
-        print("Signup Request Received")
-        print("Data:", request.data)
-        print("=" * 50)
+        log.debug('signup_request', data=request.data)
         
         serializer = CreateUserInputSerializer(data=request.data)
         
         if serializer.is_valid():
-            print("✅ Validation passed, creating user...")
             try:
                 user = serializer.save()
                 refresh = RefreshToken.for_user(user)
                 
                 response_data = {
-                    'user': UserOutputSerializer(user).data,
+                    'user': serialize(UserOutputSerializer(user)),
                     'access_token': str(refresh.access_token),
                     'refresh_token': str(refresh),
                 }
                 
-                print("✅ SUCCESS! User created:", user.phone_number)
+                log.info('user_signed_up', user_id=user.id, phone_number=user.phone_number)
                 return Response(response_data, status=status.HTTP_201_CREATED)
             
             except Exception as e:
-                print("❌ Error creating user:", str(e))
+                log.exception('signup_failed')
                 return Response(
                     {'error': f'Failed to create user: {str(e)}'},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
         
-        print("❌ Validation FAILED")
-        print("Errors:", serializer.errors)
-        print("=" * 50)
+        log.info('signup_invalid', errors=serializer.errors)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -54,10 +53,7 @@ class UserLoginView(APIView):
     permission_classes = []      # Disable permissions
     
     def post(self, request):
-        print("=" * 50)
-        print("Login Request Received")
-        print("Data:", {**request.data, 'password': '***'})  # Hide password in logs
-        print("=" * 50)
+        log.debug('login_request', data=request.data)
         
         serializer = LoginUserInputSerializer(data=request.data)
         
@@ -70,11 +66,11 @@ class UserLoginView(APIView):
             
             if user:
                 # ✅ Existing user with correct password
-                print("✅ User authenticated successfully:", phone_number)
+                log.info('login_succeeded', user_id=user.id, phone_number=phone_number)
                 refresh = RefreshToken.for_user(user)
                 
                 return Response({
-                    'user': UserOutputSerializer(user).data,
+                    'user': serialize(UserOutputSerializer(user)),
                     'access_token': str(refresh.access_token),
                     'refresh_token': str(refresh),
                 }, status=status.HTTP_200_OK)
@@ -82,7 +78,7 @@ class UserLoginView(APIView):
             # Check if user exists (for better error message)
             if User.objects.filter(phone_number=phone_number).exists():
                 # ✅ User exists but wrong password
-                print("❌ Invalid password for:", phone_number)
+                log.info('login_failed', phone_number=phone_number, reason='invalid_password')
                 return Response({
                     'error': 'Invalid credentials. Please check your password.'
                 }, status=status.HTTP_401_UNAUTHORIZED)
@@ -92,13 +88,12 @@ class UserLoginView(APIView):
             
             if not first_name:
                 # User doesn't exist and no first_name = can't auto-create
-                print("❌ User not found and no first_name for auto-create:", phone_number)
+                log.info('login_failed', phone_number=phone_number, reason='account_not_found')
                 return Response({
                     'error': 'Account not found. Please sign up first or provide your name to create an account.'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # Auto-create new user
-            print("✅ Auto-creating new user:", phone_number)
             last_name = serializer.validated_data.get('last_name', '')
             email = serializer.validated_data.get('email')
             
@@ -112,22 +107,20 @@ class UserLoginView(APIView):
                 )
                 
                 refresh = RefreshToken.for_user(user)
-                print("✅ New user created successfully:", phone_number)
+                log.info('user_auto_created', user_id=user.id, phone_number=phone_number)
                 
                 return Response({
-                    'user': UserOutputSerializer(user).data,
+                    'user': serialize(UserOutputSerializer(user)),
                     'access_token': str(refresh.access_token),
                     'refresh_token': str(refresh),
                 }, status=status.HTTP_201_CREATED)
             
             except Exception as e:
-                print("❌ Error auto-creating user:", str(e))
+                log.exception('user_auto_create_failed', phone_number=phone_number)
                 return Response({
                     'error': f'Failed to create account: {str(e)}'
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-        print("❌ Validation FAILED")
-        print("Errors:", serializer.errors)
-        print("=" * 50)
+        log.info('login_invalid', errors=serializer.errors)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class MainAppConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'app'
+
+    def ready(self):
+        # Connect the cache invalidation receivers
+        from app import signals  # noqa: F401
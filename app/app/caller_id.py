@@ -0,0 +1,133 @@
+"""
+Caller ID: who is behind a phone number, for incoming-call identification.
+Lookups go through an in-process LRU, then the shared Django cache, and only
+then the database. Signups, contact changes and spam reports invalidate them.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from app import metrics
+from app.utils import LRUCache
+
+
+_local_cache = LRUCache(settings.CALLER_ID_LOCAL_CACHE_SIZE, settings.CALLER_ID_LOCAL_CACHE_TIMEOUT)
+
+
+def caller_id_cache_key(phone_number):
+    return f'caller-id:{phone_number}'
+
+
+def best_contact_names(phone_numbers):
+    """
+    {phone_number: name most contacts saved it under} for the given numbers,
+    read from the name consensus in one query. Numbers nobody saved are left out.
+    """
+    from app.models.name_consensus import NameConsensus
+
+    return dict(
+        NameConsensus.objects.filter(phone_number__in=phone_numbers).values_list('phone_number', 'best_name')
+    )
+
+
+def resolve_caller_ids(phone_numbers):
+    """
+    Uncached identities of normalized numbers as {phone_number: entry},
+    in at most three set-based queries however many numbers are given
+    """
+    from app.models.scam_aggregate import ScamAggregate
+    from app.models.user import User
+
+    phone_numbers = set(phone_numbers)
+    if not phone_numbers:
+        return {}
+
+    users = {
+        user['phone_number']: user
+        for user in User.objects.filter(phone_number__in=phone_numbers).values('phone_number', 'first_name', 'last_name')
+    }
+    contact_names = best_contact_names(phone_numbers - users.keys()) if phone_numbers - users.keys() else {}
+    spam_counts = ScamAggregate.objects.counts_for(phone_numbers)
+
+    entries = {}
+    for phone_number in phone_numbers:
+        user = users.get(phone_number)
+        if user:
+            # Same fallback as User.get_full_name
+            name = f"{user['first_name']} {user['last_name']}".strip() or phone_number
+        else:
+            name = contact_names.get(phone_number)
+        entries[phone_number] = {
+            'phone_number': phone_number,
+            'name': name,
+            'is_registered': user is not None,
+            'spam_likelihood': spam_counts[phone_number],
+        }
+    return entries
+
+
+def lookup_caller_id(phone_number):
+    """
+    Identity of a normalized number as (entry, tier), where tier tells which
+    cache answered: 'LOCAL', 'SHARED' or 'MISS' for the database
+    """
+    entry = _local_cache.get(phone_number)
+    tier = 'LOCAL'
+    if entry is None:
+        key = caller_id_cache_key(phone_number)
+        entry = cache.get(key)
+        tier = 'SHARED'
+        if entry is None:
+            entry = resolve_caller_ids([phone_number])[phone_number]
+            cache.set(key, entry, settings.CALLER_ID_CACHE_TIMEOUT)
+            tier = 'MISS'
+        _local_cache.set(phone_number, entry)
+    metrics.count_cache_lookups('caller_id_local', hits=int(tier == 'LOCAL'), misses=int(tier != 'LOCAL'))
+    if tier != 'LOCAL':
+        metrics.count_cache_lookups('caller_id_shared', hits=int(tier == 'SHARED'), misses=int(tier == 'MISS'))
+    return dict(entry), tier
+
+
+def lookup_caller_ids(phone_numbers):
+    """
+    {phone_number: entry} for many normalized numbers. Both cache tiers are
+    read in bulk and all misses are resolved together.
+    """
+    phone_numbers = set(phone_numbers)
+    entries = {}
+    for phone_number in phone_numbers:
+        entry = _local_cache.get(phone_number)
+        if entry is not None:
+            entries[phone_number] = entry
+
+    missing = phone_numbers - entries.keys()
+    metrics.count_cache_lookups('caller_id_local', hits=len(entries), misses=len(missing))
+    if missing:
+        shared = cache.get_many([caller_id_cache_key(phone) for phone in missing])
+        found = {entry['phone_number']: entry for entry in shared.values()}
+        metrics.count_cache_lookups('caller_id_shared', hits=len(found), misses=len(missing) - len(found))
+        resolved = resolve_caller_ids(missing - found.keys())
+        if resolved:
+            cache.set_many(
+                {caller_id_cache_key(phone): entry for phone, entry in resolved.items()},
+                settings.CALLER_ID_CACHE_TIMEOUT,
+            )
+        for phone_number, entry in {**found, **resolved}.items():
+            _local_cache.set(phone_number, entry)
+            entries[phone_number] = entry
+
+    return {phone_number: dict(entry) for phone_number, entry in entries.items()}
+
+
+def invalidate_caller_id(phone_numbers):
+    """Drop the cached identities of the given numbers once the current transaction commits"""
+    phone_numbers = {phone for phone in phone_numbers if phone}
+    if not phone_numbers:
+        return
+
+    def drop():
+        for phone in phone_numbers:
+            _local_cache.delete(phone)
+        cache.delete_many([caller_id_cache_key(phone) for phone in phone_numbers])
+
+    transaction.on_commit(drop)
@@ -0,0 +1,81 @@
+"""
+Per-request SQL and timing measurements, collected by
+app.middleware.RequestMetricsMiddleware for the request being handled
+"""
+import contextlib
+import contextvars
+import time
+
+# Metrics of the request being handled, None outside of requests
+current_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Counters of one request. Also a database execute wrapper, so every query run
+    while it is installed is counted and timed.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.finished = None
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self._serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += time.perf_counter() - started
+
+    @contextlib.contextmanager
+    def serializing(self):
+        # Serializers building .data of other serializers are already counted by the outer one
+        self._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._serializer_depth -= 1
+            if not self._serializer_depth:
+                self.serializer_seconds += time.perf_counter() - started
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def timings(self):
+        """{name: milliseconds} of db, serializer, view (when a view ran) and total"""
+        timings = {
+            'db': self.db_seconds * 1000,
+            'serializer': self.serializer_seconds * 1000,
+        }
+        if self.view_started is not None:
+            timings['view'] = (self.finished - self.view_started) * 1000
+        timings['total'] = (self.finished - self.started) * 1000
+        return {name: round(ms, 2) for name, ms in timings.items()}
+
+    def server_timing(self):
+        """Server-Timing header value, which browser dev tools show next to the request"""
+        entries = []
+        for name, ms in self.timings().items():
+            description = f';desc="{self.queries} queries"' if name == 'db' else ''
+            entries.append(f'{name}{description};dur={ms}')
+        return ', '.join(entries)
+
+
+def serialize(serializer):
+    """
+    serializer.data, timed into the current request's metrics. Views build their
+    output through this, since lazy querysets and SerializerMethodFields run their
+    queries there and that is where N+1 patterns show up.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return serializer.data
+    with metrics.serializing():
+        return serializer.data
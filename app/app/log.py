@@ -0,0 +1,223 @@
+"""
+Structured, non-blocking logging.
+Requests only put records on a queue; a background thread formats them as JSON
+lines and writes them out, so workers never wait on stdout or the log file.
+Log through get_logger(__name__) with an event name and keyword fields:
+
+    log = get_logger(__name__)
+    log.info('contact_created', contact_id=contact.id, phone_number=contact.phone_number)
+
+Nothing is built when the level is disabled, so pass values, not f-strings.
+Fields are encoded, and passwords and tokens in them masked, by the writer thread.
+"""
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from datetime import datetime, timezone
+
+# Id of the request being handled, set by app.middleware.RequestIdMiddleware
+request_id = contextvars.ContextVar('request_id', default=None)
+
+# Keys whose values never reach the logs, at any depth of a field
+SENSITIVE_KEYS = {'password', 'confirm_password', 'access_token', 'refresh_token', 'token'}
+
+
+def redact(value):
+    """Copy of a field value with the values of SENSITIVE_KEYS masked"""
+    if hasattr(value, 'items'):
+        return {key: '***' if key in SENSITIVE_KEYS else redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+class StructuredLogger:
+    """
+    Logger taking an event name plus keyword fields, which end up as keys of the
+    JSON record instead of being formatted into a message
+    """
+
+    def __init__(self, name):
+        self.logger = logging.getLogger(name)
+
+    def log(self, level, event, exc_info=None, **fields):
+        if self.logger.isEnabledFor(level):
+            # stacklevel 3 attributes the record to the caller of debug()/info()/...
+            self.logger.log(level, event, exc_info=exc_info, extra={'fields': fields}, stacklevel=3)
+
+    def debug(self, event, **fields):
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event, **fields):
+        self.log(logging.ERROR, event, **fields)
+
+    def exception(self, event, **fields):
+        """Error with the traceback of the exception being handled"""
+        self.log(logging.ERROR, event, exc_info=True, **fields)
+
+
+def get_logger(name):
+    return StructuredLogger(name)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, event, request_id, the fields and exc"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        if getattr(record, 'sample_rate', 1) < 1:
+            entry['sample_rate'] = record.sample_rate
+        for key, value in redact(getattr(record, 'fields', {})).items():
+            entry.setdefault(key, value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Short `LEVEL event key=value ...` lines for the console"""
+
+    def format(self, record):
+        parts = [record.levelname, record.getMessage()]
+        parts += [f'{key}={value!r}' for key, value in redact(getattr(record, 'fields', {})).items()]
+        if getattr(record, 'request_id', None):
+            parts.append(f'request_id={record.request_id}')
+        line = ' '.join(parts)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a share of the records below ERROR of high-volume loggers.
+    `rates` maps logger names to the share kept, and applies to their children
+    too; the most specific name wins. Kept records carry their sample_rate.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+
+    def rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return 1
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1:
+            return True
+        record.sample_rate = rate
+        return random.random() < rate
+
+
+class BackgroundHandler(logging.handlers.QueueHandler):
+    """
+    Queues records for a writer thread that sends them to a JSON lines file
+    and/or a console stream. When queue_size records are already waiting, new
+    ones are dropped rather than blocking the request, and the number dropped
+    is logged, at most once a second, once the queue has room again.
+    """
+
+    def __init__(self, filename=None, stream=None, queue_size=10000):
+        super().__init__(None)
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._reported_at = 0
+
+        self.targets = []
+        if filename:
+            # Watched, so logrotate can move the file away underneath it
+            file_handler = logging.handlers.WatchedFileHandler(filename, delay=True)
+            file_handler.setFormatter(JsonFormatter())
+            self.targets.append(file_handler)
+        if stream:
+            stream_handler = logging.StreamHandler(stream)
+            stream_handler.setFormatter(ConsoleFormatter())
+            self.targets.append(stream_handler)
+        self._start()
+
+    def _start(self):
+        self._pid = os.getpid()
+        self.queue = queue.Queue(self.queue_size)
+        self.listener = logging.handlers.QueueListener(self.queue, *self.targets)
+        self.listener.start()
+
+    def prepare(self, record):
+        # Only what can't wait for the writer: message arguments and tracebacks may
+        # change once the caller moves on, and the request id is per thread.
+        # Other handlers still see the original record.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_id = request_id.get()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped > self._reported_dropped and time.monotonic() - self._reported_at >= 1:
+            dropped = self.dropped - self._reported_dropped
+            self._reported_dropped = self.dropped
+            self._reported_at = time.monotonic()
+            report = logging.LogRecord(
+                'app.log', logging.WARNING, __file__, 0, 'log_records_dropped', None, None
+            )
+            report.fields = {'count': dropped}
+            try:
+                self.queue.put_nowait(report)
+            except queue.Full:
+                self._reported_dropped -= dropped
+
+    def emit(self, record):
+        # A forked worker inherits the handler but not its writer thread
+        if os.getpid() != self._pid:
+            self._start()
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        # Runs from logging.shutdown() at exit, after writing out what is queued
+        if self.listener is not None and os.getpid() == self._pid:
+            self.listener.stop()
+        self.listener = None
+        for target in self.targets:
+            target.close()
+        super().close()
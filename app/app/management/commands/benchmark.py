@@ -0,0 +1,297 @@
+import io
+import json
+import logging
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Sum
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+from app.api.viewsets.dashboard import dashboard_cache_key
+from app.models.contact import Contact
+from app.models.interaction import Interaction
+from app.models.scam_aggregate import ScamAggregate
+from app.middleware import query_budget_for
+from app.models.user import User
+from app.spam_filter import reported_numbers
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the main API endpoints against a freshly seeded test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=2000,
+            help='Users in the seeded dataset (default: 2000)'
+        )
+        parser.add_argument(
+            '--contacts',
+            type=int,
+            default=None,
+            help='Contacts in the seeded dataset (default: 10 per user)'
+        )
+        parser.add_argument(
+            '--spam-reports',
+            type=int,
+            default=None,
+            help='Spam reports in the seeded dataset (default: 2 per user)'
+        )
+        parser.add_argument(
+            '--interactions',
+            type=int,
+            default=None,
+            help='Interactions in the seeded dataset (default: 10 per user)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Seed for the dataset and the request mix (default: 42)'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Measured requests per endpoint (default: 50)'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help='Unmeasured requests per endpoint before measuring (default: 5)'
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the seeded test database and reuse it on the next run'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Result file (default: benchmarks/<commit>-<timestamp>.json)'
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            default=None,
+            help='Earlier result file to print latency and query deltas against'
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+        self.rng = random.Random(kwargs['seed'])
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=kwargs['keepdb'])
+        # The spam filter of the benchmark database, so the configured one is left alone
+        spam_filter_dir = tempfile.TemporaryDirectory()
+        spam_filter_settings = override_settings(SPAM_FILTER_PATH=Path(spam_filter_dir.name) / 'spam_filter.bin')
+        spam_filter_settings.enable()
+        reported_numbers.reset()
+        try:
+            if not User.objects.exists():
+                self.stdout.write(self.style.WARNING('🌱 Seeding benchmark database...'))
+                call_command(
+                    'populate',
+                    bulk=True,
+                    users=kwargs['users'],
+                    contacts=kwargs['contacts'],
+                    spam_reports=kwargs['spam_reports'],
+                    interactions=kwargs['interactions'],
+                    seed=kwargs['seed'],
+                    stdout=self.stdout if kwargs['verbosity'] > 1 else io.StringIO(),
+                )
+            dataset = {
+                'users': User.objects.count(),
+                'contacts': Contact.objects.count(),
+                'spam_reports': ScamAggregate.objects.aggregate(total=Sum('report_count'))['total'] or 0,
+                'interactions': Interaction.objects.count(),
+            }
+
+            # One app.requests record per measured request would flood the console
+            request_logger = logging.getLogger('app.requests')
+            request_log_level = request_logger.level
+            request_logger.setLevel(logging.WARNING)
+            try:
+                results = self.run_benchmarks(kwargs['iterations'], kwargs['warmup'])
+            finally:
+                request_logger.setLevel(request_log_level)
+        finally:
+            reported_numbers.reset()
+            spam_filter_settings.disable()
+            spam_filter_dir.cleanup()
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=kwargs['keepdb'])
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'commit': self.git_commit(),
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'seed': kwargs['seed'],
+                'iterations': kwargs['iterations'],
+                'dataset': dataset,
+            },
+            'results': results,
+        }
+
+        output = Path(kwargs['output']) if kwargs['output'] else (
+            Path(settings.BASE_DIR) / 'benchmarks'
+            / f"{report['meta']['commit'] or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+
+        previous = json.loads(Path(kwargs['compare']).read_text())['results'] if kwargs['compare'] else {}
+        self.print_report(results, previous)
+        self.stdout.write(self.style.SUCCESS(f'✅ Results written to {output}'))
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def sample(self, queryset, size):
+        values = list(queryset[:size * 10])
+        return self.rng.sample(values, min(size, len(values)))
+
+    def run_benchmarks(self, iterations, warmup):
+        # The benchmark user is the busiest one, which is the worst case for the dashboard views
+        user = User.objects.annotate(
+            interaction_count=Count('initiated_interactions')
+        ).order_by('-interaction_count', 'id').first()
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+        # Ordered by the seeded ids, so the same seed sends the same requests
+        names = self.sample(Contact.objects.order_by('id').values_list('first_name', flat=True), 200)
+        phones = self.sample(User.objects.order_by('id').values_list('phone_number', flat=True), 200)
+        spam_phones = list(
+            ScamAggregate.objects.order_by('-report_count', 'phone_number').values_list('phone_number', flat=True)[:50]
+        )
+        detail_ids = [str(pk) for pk in self.sample(User.objects.order_by('id').values_list('id', flat=True), 100)]
+        detail_ids += [str(pk) for pk in self.sample(Contact.objects.order_by('id').values_list('id', flat=True), 100)]
+
+        def new_spam_number():
+            # Unique per request, so every report is a real insert
+            return f'+91{self.rng.randrange(6000000000, 10000000000)}'
+
+        def cold_dashboard():
+            # Warmup and earlier iterations cached it, dropping it measures the full build
+            cache.delete(dashboard_cache_key(user.id))
+            return client.get('/api/dashboard')
+
+        endpoints = {
+            'search_phone': lambda: client.get('/api/search', {'q': self.rng.choice(phones)}),
+            'search_name': lambda: client.get('/api/search', {'q': self.rng.choice(names)}),
+            'caller_id': lambda: client.get('/api/caller-id', {'phone_number': self.rng.choice(phones)}),
+            'caller_id_batch': lambda: client.post(
+                '/api/caller-id/batch', {'phone_numbers': self.rng.sample(phones, min(50, len(phones)))},
+                content_type='application/json',
+            ),
+            'search_detail': lambda: client.get(f'/api/search/detail/{self.rng.choice(detail_ids)}'),
+            'dashboard': lambda: client.get('/api/dashboard'),
+            'dashboard_cold': cold_dashboard,
+            'top_contacts': lambda: client.get('/api/interactions/top'),
+            'spam_stats': lambda: client.get('/api/interactions/spam-stats'),
+            'spam_stats_phone': lambda: client.get(
+                '/api/interactions/spam-stats', {'phone_number': self.rng.choice(spam_phones or phones)}
+            ),
+            'contacts_list': lambda: client.get('/api/contact'),
+            'contacts_list_fields': lambda: client.get('/api/contact', {'fields': 'phone_number,full_name'}),
+            'contact_changes': lambda: client.get('/api/contact/changes', {'since': 0, 'limit': 100}),
+            'spam_report': lambda: client.post(
+                '/api/spam', {'phone_number': new_spam_number(), 'description': 'Benchmark'},
+                content_type='application/json',
+            ),
+        }
+
+        results = {}
+        for name, send in endpoints.items():
+            for _ in range(warmup):
+                send()
+
+            latencies = []
+            query_counts = []
+            errors = 0
+            query_budget = None
+            started = time.perf_counter()
+            for _ in range(iterations):
+                with CaptureQueriesContext(connection) as queries:
+                    request_started = time.perf_counter()
+                    response = send()
+                    latencies.append((time.perf_counter() - request_started) * 1000)
+                query_counts.append(len(queries))
+                if response.status_code >= 400:
+                    errors += 1
+                query_budget = query_budget_for(response.wsgi_request)
+            elapsed = time.perf_counter() - started
+
+            latencies.sort()
+            results[name] = {
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p95_ms': round(percentile(latencies, 95), 3),
+                'p99_ms': round(percentile(latencies, 99), 3),
+                'mean_ms': round(sum(latencies) / len(latencies), 3),
+                'throughput_rps': round(iterations / elapsed, 1),
+                'queries_mean': round(sum(query_counts) / len(query_counts), 1),
+                'queries_max': max(query_counts),
+                'errors': errors,
+                'query_budget': query_budget,
+            }
+            if query_budget is not None and max(query_counts) > query_budget:
+                self.stdout.write(self.style.ERROR(
+                    f'  {name}: {max(query_counts)} queries, over its budget of {query_budget}'
+                ))
+            self.stdout.write(f'  {name}: p50 {results[name]["p50_ms"]} ms')
+
+        return results
+
+    def print_report(self, results, previous):
+        self.stdout.write(self.style.SUCCESS('\n' + '='*78))
+        self.stdout.write(self.style.SUCCESS(
+            f'{"endpoint":<18}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"req/s":>10}{"queries":>10}{"errors":>10}'
+        ))
+        self.stdout.write(self.style.SUCCESS('='*78))
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:<18}{stats["p50_ms"]:>10}{stats["p95_ms"]:>10}{stats["p99_ms"]:>10}'
+                f'{stats["throughput_rps"]:>10}{stats["queries_mean"]:>10}{stats["errors"]:>10}'
+            )
+            if name in previous:
+                before = previous[name]
+                p50_change = (stats['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+                self.stdout.write(
+                    f'{"  vs previous":<18}{p50_change:>+9.1f}%'
+                    f'{"":>30}{stats["queries_mean"] - before["queries_mean"]:>+10.1f}'
+                )
+        self.stdout.write(self.style.SUCCESS('='*78 + '\n'))
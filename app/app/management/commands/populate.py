@@ -1,6 +1,11 @@
 import random
-from django.core.management.base import BaseCommand
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
 from faker import Faker
 from app.models.contact import Contact
 from app.models.scam import ScamRecord
@@ -11,6 +16,153 @@ import os
 
 fake = Faker()
 
+# Every 10-digit number in this range is a valid Indian mobile number,
+# so bulk mode can generate numbers without running them through phonenumbers
+BULK_PHONE_RANGE = (6000000000, 10000000000)
+BULK_USERS_PER_CHUNK = 1000
+SPAM_DESCRIPTIONS = [
+    'Telemarketing call',
+    'Spam message',
+    'Scam attempt',
+    'Unwanted promotional call',
+    'Phishing attempt',
+    'Robocall',
+    'Fraudulent activity'
+]
+
+# Shared by the bulk workers, set by _init_bulk_worker
+_bulk = {}
+
+
+def _init_bulk_worker(phones, num_users, seed, password_hash, batch_size):
+    _bulk.update(
+        phones=phones,
+        num_users=num_users,
+        seed=seed,
+        password_hash=password_hash,
+        batch_size=batch_size,
+    )
+
+
+def _bulk_user_id(index):
+    # Derived from the index so any chunk can reference any user without a lookup
+    return uuid.uuid5(uuid.NAMESPACE_OID, f"populate:{_bulk['seed']}:user:{index}")
+
+
+def _bulk_phone(index):
+    return f"+91{_bulk['phones'][index]}"
+
+
+def _bulk_chunk_random(kind, start):
+    rng = random.Random(f"{_bulk['seed']}:{kind}:{start}")
+    chunk_fake = Faker()
+    chunk_fake.seed_instance(f"{_bulk['seed']}:{kind}:{start}")
+    return rng, chunk_fake
+
+
+def _bulk_create_users(start, end):
+    """Insert users start..end-1, returns how many were created"""
+    rng, chunk_fake = _bulk_chunk_random('users', start)
+
+    users = []
+    for index in range(start, end):
+        first_name = chunk_fake.first_name()
+        last_name = chunk_fake.last_name()
+        users.append(User(
+            id=_bulk_user_id(index),
+            phone_number=_bulk_phone(index),
+            first_name=first_name,
+            last_name=last_name,
+            # Emails are unique, so they carry the user index
+            email=f"{first_name}.{last_name}.{index}@example.com".lower() if rng.random() < 0.5 else None,
+            password=_bulk['password_hash'],
+        ))
+
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=_bulk['batch_size'])
+    return len(users)
+
+
+def _bulk_create_activity(start, end, num_contacts, num_spam, num_interactions):
+    """
+    Insert contacts, spam reports and interactions owned by users start..end-1.
+    Returns (contacts, spam reports, interactions) created.
+    """
+    rng, chunk_fake = _bulk_chunk_random('activity', start)
+    phones = _bulk['phones']
+    num_users = _bulk['num_users']
+    batch_size = _bulk['batch_size']
+    # A small set of numbers gets most spam reports, like real spammers
+    hot_spammers = max(1, len(phones) // 100)
+
+    def unique_pairs(count, pick_phone):
+        # (owner, phone index) pairs, unique like the model constraints require
+        seen = set()
+        limit = (end - start) * len(phones)
+        while len(seen) < min(count, limit):
+            pair = (rng.randrange(start, end), pick_phone())
+            if pair not in seen:
+                seen.add(pair)
+                yield pair
+
+    def spam_phone():
+        if rng.random() < 0.7:
+            return rng.randrange(len(phones) - hot_spammers, len(phones))
+        return rng.randrange(len(phones))
+
+    with transaction.atomic():
+        contacts = []
+        for owner, phone_index in unique_pairs(num_contacts, lambda: rng.randrange(len(phones))):
+            owner_id = _bulk_user_id(owner)
+            contacts.append(Contact(
+                id=uuid.UUID(int=rng.getrandbits(128), version=4),
+                first_name=chunk_fake.first_name(),
+                last_name=chunk_fake.last_name(),
+                phone_number=_bulk_phone(phone_index),
+                created_by_id=owner_id,
+                updated_by_id=owner_id,
+            ))
+        Contact.objects.bulk_create(contacts, batch_size=batch_size)
+
+        spam_reports = []
+        for reporter, phone_index in unique_pairs(num_spam, spam_phone):
+            reporter_id = _bulk_user_id(reporter)
+            spam_reports.append(ScamRecord(
+                id=uuid.UUID(int=rng.getrandbits(128), version=4),
+                phone_number=_bulk_phone(phone_index),
+                reported_by_id=reporter_id,
+                created_by_id=reporter_id,
+                updated_by_id=reporter_id,
+                description=rng.choice(SPAM_DESCRIPTIONS),
+            ))
+        ScamRecord.objects.bulk_create(spam_reports, batch_size=batch_size)
+
+        interactions = []
+        for _ in range(num_interactions):
+            receiver = rng.randrange(len(phones))
+            interaction_type = rng.choice(['call', 'message', 'spam_report'])
+            metadata = {}
+            if interaction_type == 'call':
+                metadata = {'duration': rng.randint(10, 600)}
+            elif interaction_type == 'message':
+                metadata = {'message_length': rng.randint(10, 200)}
+            interactions.append(Interaction(
+                id=uuid.UUID(int=rng.getrandbits(128), version=4),
+                initiator_id=_bulk_user_id(rng.randrange(start, end)),
+                receiver_id=_bulk_user_id(receiver) if receiver < num_users else None,
+                receiver_phone=_bulk_phone(receiver),
+                interaction_type=interaction_type,
+                metadata=metadata,
+            ))
+        Interaction.objects.bulk_create(interactions, batch_size=batch_size)
+
+    return len(contacts), len(spam_reports), len(interactions)
+
+
+def _chunk_share(total, start, end, num_users):
+    """Part of `total` owned by users start..end-1, shares of all chunks add up to total"""
+    return total * end // num_users - total * start // num_users
+
 
 class Command(BaseCommand):
     help = 'Populate database with sample data'
@@ -40,12 +192,71 @@ class Command(BaseCommand):
             default='password123',
             help='Default password for test users (default: password123)'
         )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Random seed, the same seed generates the same dataset'
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='High-throughput mode for load-test datasets, uses bulk inserts and exact totals'
+        )
+        parser.add_argument(
+            '--contacts',
+            type=int,
+            default=None,
+            help='Bulk mode: total contacts (default: 10 per user)'
+        )
+        parser.add_argument(
+            '--spam-reports',
+            type=int,
+            default=None,
+            help='Bulk mode: total spam reports (default: 2 per user)'
+        )
+        parser.add_argument(
+            '--interactions',
+            type=int,
+            default=None,
+            help='Bulk mode: total interactions (default: 10 per user)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Bulk mode: rows per INSERT (default: 10000)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Bulk mode: worker processes (default: 1, use more with PostgreSQL only)'
+        )
 
     def handle(self, *args, **kwargs):
         num_users = kwargs['users']
         max_contacts = kwargs['max_contacts']
         max_spam = kwargs['max_spam']
         default_password = kwargs['password']
+        seed = kwargs['seed']
+        
+        if kwargs['bulk']:
+            self.bulk_populate_database(
+                num_users,
+                kwargs['contacts'] if kwargs['contacts'] is not None else num_users * 10,
+                kwargs['spam_reports'] if kwargs['spam_reports'] is not None else num_users * 2,
+                kwargs['interactions'] if kwargs['interactions'] is not None else num_users * 10,
+                default_password,
+                seed if seed is not None else random.randrange(2 ** 32),
+                kwargs['batch_size'],
+                kwargs['workers'],
+            )
+            return
+        
+        if seed is not None:
+            random.seed(seed)
+            Faker.seed(seed)
         
         self.stdout.write(self.style.SUCCESS(f'Starting to populate database...'))
         self.stdout.write(f'Creating {num_users} users...')
@@ -60,7 +271,7 @@ class Command(BaseCommand):
         last_name = fake.last_name()
         
         # Get default region from settings
-        default_region = getattr(settings, 'PHONENUMBER_DEFAULT_REGION', 'IN')
+        default_region = settings.PHONENUMBER_DEFAULT_REGION
         
         # Generate phone based on region
         if default_region == 'IN':
@@ -88,12 +299,12 @@ class Command(BaseCommand):
         # Random email (50% chance)
         email = fake.email() if random.choice([True, False]) else None
         
-        # Create user with password from argument
-        user = User.objects.create(
-            first_name=first_name,
-            last_name=last_name,
+        # Create user with password from argument, hashed by create_user
+        user = User.objects.create_user(
             phone_number=normalized_phone,
             password=default_password,
+            first_name=first_name,
+            last_name=last_name,
             email=email
         )
         
@@ -106,7 +317,7 @@ class Command(BaseCommand):
         last_name = fake.last_name()
         
         # Get default region from settings
-        default_region = getattr(settings, 'PHONENUMBER_DEFAULT_REGION', 'IN')
+        default_region = settings.PHONENUMBER_DEFAULT_REGION
         
         # Generate phone based on region
         if default_region == 'IN':
@@ -138,23 +349,13 @@ class Command(BaseCommand):
         except:
             return None
         
-        descriptions = [
-            'Telemarketing call',
-            'Spam message',
-            'Scam attempt',
-            'Unwanted promotional call',
-            'Phishing attempt',
-            'Robocall',
-            'Fraudulent activity'
-        ]
-        
         try:
             spam = ScamRecord.objects.create(
                 phone_number=normalized_phone,
                 reported_by=user,
                 created_by=user,
                 updated_by=user,
-                description=random.choice(descriptions)
+                description=random.choice(SPAM_DESCRIPTIONS)
             )
             return spam
         except Exception as e:
@@ -191,12 +392,93 @@ class Command(BaseCommand):
         except Exception as e:
             return None
 
+    def bulk_populate_database(self, num_users, num_contacts, num_spam, num_interactions,
+                               default_password, seed, batch_size, workers):
+        """Bulk population logic, work is split into chunks of users"""
+        if num_users < 1:
+            raise CommandError('Bulk mode needs at least one user')
+        
+        self.stdout.write(self.style.SUCCESS(f'Starting bulk population (seed {seed})...'))
+        
+        # Registered users take the first num_users numbers, the rest are unregistered callers
+        rng = random.Random(seed)
+        phones = rng.sample(range(*BULK_PHONE_RANGE), num_users * 3)
+        # Hashing once keeps a properly hashed password without paying PBKDF2 per user
+        password_hash = make_password(default_password)
+        init_args = (phones, num_users, seed, password_hash, batch_size)
+        chunks = [
+            (start, min(start + BULK_USERS_PER_CHUNK, num_users))
+            for start in range(0, num_users, BULK_USERS_PER_CHUNK)
+        ]
+        
+        if workers > 1:
+            # Forked workers must not share the parent's database connection
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_bulk_worker, initargs=init_args)
+            run = executor.map
+        else:
+            _init_bulk_worker(*init_args)
+            executor = None
+            run = map
+        
+        try:
+            # All users exist before any interaction can point at them
+            self.stdout.write(self.style.WARNING('\n📱 Creating Users...'))
+            total_users = 0
+            for created in run(_bulk_create_users, *zip(*chunks)):
+                total_users += created
+                self.stdout.write(f'  {total_users}/{num_users} users')
+            
+            self.stdout.write(self.style.WARNING('\n📞 Creating Contacts, Spam Reports and Interactions...'))
+            totals = [0, 0, 0]
+            for created in run(
+                _bulk_create_activity,
+                *zip(*[
+                    (
+                        start,
+                        end,
+                        _chunk_share(num_contacts, start, end, num_users),
+                        _chunk_share(num_spam, start, end, num_users),
+                        _chunk_share(num_interactions, start, end, num_users),
+                    )
+                    for start, end in chunks
+                ])
+            ):
+                totals = [total + count for total, count in zip(totals, created)]
+                self.stdout.write(f'  {totals[0]} contacts, {totals[1]} spam reports, {totals[2]} interactions')
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        # bulk_create skips the save() hooks that maintain these tables
+        self.stdout.write(self.style.WARNING('\n🔁 Rebuilding derived tables...'))
+        call_command('rebuild_scam_aggregates', batch_size=batch_size, stdout=self.stdout)
+        call_command('refresh_spam_leaderboard', full=True, settle_seconds=0, stdout=self.stdout)
+        call_command('rebuild_name_index', stdout=self.stdout)
+        call_command('rebuild_name_consensus', batch_size=batch_size, stdout=self.stdout)
+        call_command('rebuild_interaction_rollups', batch_size=batch_size, stdout=self.stdout)
+        call_command('stamp_contact_versions', batch_size=batch_size, stdout=self.stdout)
+        
+        self.stdout.write(self.style.SUCCESS('\n' + '='*50))
+        self.stdout.write(self.style.SUCCESS('DATABASE POPULATION SUMMARY:'))
+        self.stdout.write(self.style.SUCCESS('='*50))
+        self.stdout.write(f'👥 Users: {total_users}')
+        self.stdout.write(f'📞 Contacts: {totals[0]}')
+        self.stdout.write(f'🚫 Spam Reports: {totals[1]}')
+        self.stdout.write(f'💬 Interactions: {totals[2]}')
+        self.stdout.write(self.style.SUCCESS('='*50))
+        self.stdout.write(self.style.WARNING('\n📝 Test User Credentials:'))
+        self.stdout.write(f'   Phone: +91{phones[0] if phones else "N/A"}')
+        self.stdout.write(f'   Password: {default_password}')
+        self.stdout.write(f'   Seed: {seed}')
+        self.stdout.write(self.style.SUCCESS('='*50 + '\n'))
+
     def populate_database(self, num_users=50, max_contacts_per_user=10, max_spam_per_user=5, default_password='password123'):
         """Main population logic"""
         users = []
         
         # Get default region from settings
-        default_region = getattr(settings, 'PHONENUMBER_DEFAULT_REGION', 'IN')
+        default_region = settings.PHONENUMBER_DEFAULT_REGION
 
         # Create users
         self.stdout.write(self.style.WARNING('\n📱 Creating Users...'))
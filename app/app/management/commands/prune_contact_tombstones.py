@@ -0,0 +1,22 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from app.models.contact_version import ContactTombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete tombstones of long-deleted contacts (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Keep tombstones this many days (default: CONTACT_TOMBSTONE_RETENTION_DAYS)'
+        )
+
+    def handle(self, *args, **kwargs):
+        days = kwargs['days'] if kwargs['days'] is not None else settings.CONTACT_TOMBSTONE_RETENTION_DAYS
+        deleted = ContactTombstone.objects.prune(timezone.now() - timedelta(days=days))
+        self.stdout.write(self.style.SUCCESS(f'✅ Pruned {deleted} contact tombstones older than {days} days'))
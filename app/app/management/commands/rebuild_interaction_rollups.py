@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from app.models.interaction import Interaction
+from app.models.interaction_rollup import InteractionRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-user daily interaction rollups from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk insert (default: 5000)'
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs['batch_size']
+
+        outgoing = Interaction.objects.annotate(day=TruncDate('created_at')).values(
+            'initiator_id', 'day', 'interaction_type'
+        ).annotate(count=Count('id')).order_by()
+        # Interactions with yourself only count as outgoing
+        incoming = Interaction.objects.exclude(receiver=None).exclude(receiver=F('initiator')).annotate(
+            day=TruncDate('created_at')
+        ).values('receiver_id', 'day', 'interaction_type').annotate(count=Count('id')).order_by()
+
+        total = 0
+        with transaction.atomic():
+            InteractionRollup.objects.all().delete()
+
+            for direction, rows, user_field in (
+                (InteractionRollup.OUTGOING, outgoing, 'initiator_id'),
+                (InteractionRollup.INCOMING, incoming, 'receiver_id'),
+            ):
+                batch = []
+                for row in rows.iterator(chunk_size=batch_size):
+                    batch.append(InteractionRollup(
+                        user_id=row[user_field],
+                        day=row['day'],
+                        interaction_type=row['interaction_type'],
+                        direction=direction,
+                        count=row['count'],
+                    ))
+                    if len(batch) >= batch_size:
+                        InteractionRollup.objects.bulk_create(batch)
+                        total += len(batch)
+                        batch = []
+
+                if batch:
+                    InteractionRollup.objects.bulk_create(batch)
+                    total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {total} interaction rollups'))
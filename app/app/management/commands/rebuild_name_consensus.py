@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from app.models.contact import Contact
+from app.models.name_consensus import NameConsensus
+from app.utils import normalize_name
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-number name consensus from all contacts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk insert (default: 5000)'
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs['batch_size']
+
+        # Contacts per exact spelling, grouped in SQL; spellings that normalize alike are merged below
+        spellings = Contact.objects.values('phone_number', 'first_name', 'last_name').annotate(
+            count=Count('id')
+        ).order_by('phone_number')
+
+        total = 0
+        with transaction.atomic():
+            NameConsensus.objects.all().delete()
+
+            batch = []
+            consensus = None
+            most_common = {}
+            for row in spellings.iterator(chunk_size=batch_size):
+                full_name = f"{row['first_name']} {row['last_name']}".strip()
+                key = normalize_name(full_name)
+                if not key:
+                    continue
+
+                if consensus is None or consensus.phone_number != row['phone_number']:
+                    if consensus is not None:
+                        consensus.tally()
+                        batch.append(consensus)
+                    consensus = NameConsensus(phone_number=row['phone_number'], votes={})
+                    most_common = {}
+
+                # Each name is shown in its most common spelling
+                vote = consensus.votes.setdefault(key, {'name': full_name, 'votes': 0})
+                vote['votes'] += row['count']
+                if row['count'] > most_common.get(key, 0):
+                    most_common[key] = row['count']
+                    vote['name'] = full_name
+
+                if len(batch) >= batch_size:
+                    NameConsensus.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+
+            if consensus is not None:
+                consensus.tally()
+                batch.append(consensus)
+            NameConsensus.objects.bulk_create(batch)
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt the name consensus of {total} numbers'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from app.models.contact import Contact
+from app.models.name_index import NameIndexEntry
+from app.models.user import User
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the trigram name index used by name search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Users/contacts indexed per batch (default: 2000)'
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs['batch_size']
+
+        with transaction.atomic():
+            NameIndexEntry.objects.all().delete()
+
+            for entity_type, model in ((NameIndexEntry.USER, User), (NameIndexEntry.CONTACT, Contact)):
+                queryset = model.objects.only('id', 'first_name', 'last_name').order_by()
+                total = 0
+                batch = []
+                for obj in queryset.iterator(chunk_size=batch_size):
+                    batch.append(obj)
+                    if len(batch) >= batch_size:
+                        NameIndexEntry.objects.bulk_create(
+                            NameIndexEntry.objects.entries_for(entity_type, batch), batch_size=5000
+                        )
+                        total += len(batch)
+                        batch = []
+                if batch:
+                    NameIndexEntry.objects.bulk_create(
+                        NameIndexEntry.objects.entries_for(entity_type, batch), batch_size=5000
+                    )
+                    total += len(batch)
+
+                self.stdout.write(f'  Indexed {total} {model._meta.verbose_name_plural.lower()}')
+
+        self.stdout.write(self.style.SUCCESS('✅ Name index rebuilt'))
+
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max
+from app.models.scam import ScamRecord
+from app.models.scam_aggregate import ScamAggregate
+from app.spam_filter import reported_numbers
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-number spam aggregates from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk insert (default: 5000)'
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs['batch_size']
+
+        stats = ScamRecord.objects.values('phone_number').annotate(
+            report_count=Count('id'),
+            unique_reporters=Count('reported_by', distinct=True),
+            latest_report_at=Max('created_at'),
+        ).order_by()
+
+        total = 0
+        with transaction.atomic():
+            ScamAggregate.objects.all().delete()
+
+            batch = []
+            for row in stats.iterator(chunk_size=batch_size):
+                batch.append(ScamAggregate(**row))
+                if len(batch) >= batch_size:
+                    ScamAggregate.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+
+            if batch:
+                ScamAggregate.objects.bulk_create(batch)
+                total += len(batch)
+
+        # The filter is built from the aggregates, so it follows them
+        reported_numbers.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt spam aggregates for {total} phone numbers'))
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from app.spam_filter import reported_numbers
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the shared Bloom filter file of reported phone numbers at SPAM_FILTER_PATH'
+
+    def handle(self, *args, **kwargs):
+        bloom = reported_numbers.rebuild()
+        if bloom is None:
+            self.stdout.write(self.style.WARNING('⚠️  SPAM_FILTER_PATH is not set, the spam filter is disabled'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rebuilt the spam filter: {bloom.bits // 8 // 1024} KiB, {bloom.hashes} hashes '
+            f'({settings.SPAM_FILTER_PATH})'
+        ))
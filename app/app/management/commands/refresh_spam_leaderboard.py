@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from app.models.spam_leaderboard import SpamLeaderboardEntry, SpamLeaderboardWatermark
+
+
+class Command(BaseCommand):
+    help = 'Fold spam reports newer than the watermark into the spam leaderboard (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rebuild from scratch, needed after spam reports were edited or deleted'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Reports per transaction (default: 5000)'
+        )
+        parser.add_argument(
+            '--settle-seconds',
+            type=int,
+            default=None,
+            help='Skip reports younger than this (default: SPAM_LEADERBOARD_SETTLE_SECONDS)'
+        )
+
+    def handle(self, *args, **kwargs):
+        refresh = SpamLeaderboardEntry.objects.rebuild if kwargs['full'] else SpamLeaderboardEntry.objects.refresh
+        processed = refresh(batch_size=kwargs['batch_size'], settle_seconds=kwargs['settle_seconds'])
+
+        watermark = SpamLeaderboardWatermark.objects.filter(pk=1).first()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Folded {processed} spam reports into the leaderboard, '
+            f'now up to {watermark.processed_until if watermark else None}'
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from app.models.contact_version import ContactVersion
+
+
+class Command(BaseCommand):
+    help = 'Give bulk-inserted contacts their delta sync change versions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk update (default: 5000)'
+        )
+
+    def handle(self, *args, **kwargs):
+        stamped = ContactVersion.objects.stamp_unversioned(batch_size=kwargs['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Stamped {stamped} contacts with change versions'))
@@ -0,0 +1,367 @@
+"""
+In-process metrics: counters, gauges and fixed-bucket histograms, exposed in
+the Prometheus text format by /api/metrics.
+Updates only touch a dict in this process. With METRICS_DIR set, a background
+thread writes the process's values to METRICS_DIR every METRICS_FLUSH_SECONDS,
+and a scrape adds up the files of every worker process on the host. The files
+of exited workers are folded into one totals file by the next scrape.
+"""
+import atexit
+import bisect
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Counters and histograms of exited workers, added up by the scrapes
+TOTALS_FILE = 'totals.json'
+
+# Latency buckets in seconds, from a cached lookup to a slow report
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def _key(self, labels):
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f'{self.name} takes the labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _changed(self):
+        self.registry.changed()
+
+    def snapshot(self):
+        """{labels as a JSON list: value} of this process"""
+        with self._lock:
+            return {json.dumps(key): value for key, value in self._values.items()}
+
+    def samples(self, values):
+        """(suffix, labels, value) exposition samples of merged snapshot values"""
+        for key, value in values.items():
+            yield '', dict(zip(self.labelnames, json.loads(key))), value
+
+
+class Counter(Metric):
+    """Total that only goes up, summed over all processes"""
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self._changed()
+
+    def set_total(self, value, **labels):
+        """Mirror a total this process already keeps elsewhere, e.g. in functools.lru_cache"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Gauge(Metric):
+    """Current value, summed over the processes that are still running"""
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+        self._changed()
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self._changed()
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Observations counted into fixed buckets, plus their sum"""
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # Per-bucket counts with +Inf last, then the sum; exposition makes them cumulative
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+        self._changed()
+
+    def snapshot(self):
+        with self._lock:
+            return {json.dumps(key): list(value) for key, value in self._values.items()}
+
+    def samples(self, values):
+        for key, counts in values.items():
+            labels = dict(zip(self.labelnames, json.loads(key)))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield '_bucket', {**labels, 'le': _format_value(bound)}, cumulative
+            yield '_sum', labels, counts[-1]
+            yield '_count', labels, cumulative
+
+
+class Registry:
+    """
+    Every metric of the process, and the writer that shares them through
+    METRICS_DIR with the process answering the scrape
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self._pid = None
+        self._path = None
+        self._dirty = threading.Event()
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self.metrics[metric.name] = metric
+
+    def add_collector(self, collect):
+        """Run `collect()` before every snapshot, to copy in values kept elsewhere"""
+        self.collectors.append(collect)
+
+    def snapshot(self):
+        for collect in self.collectors:
+            collect()
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def after_fork(self):
+        # The parent's values stay in the parent's file, the child starts from zero.
+        # A thread of the parent may have held a lock while it forked.
+        for metric in self.metrics.values():
+            metric._lock = threading.Lock()
+            metric._values = {}
+
+    def changed(self):
+        if not settings.METRICS_DIR:
+            return
+        # A forked worker inherits the registry but not its writer thread
+        if self._pid != os.getpid():
+            self._start_writer()
+        self._dirty.set()
+
+    def _start_writer(self):
+        self._pid = os.getpid()
+        # Unique per process start, so a reused pid never overwrites the totals of a dead worker
+        self._path = Path(settings.METRICS_DIR) / f'{self._pid}-{uuid.uuid4().hex[:8]}.json'
+        self._dirty = threading.Event()
+        threading.Thread(target=self._write_periodically, name='metrics-writer', daemon=True).start()
+
+    def _write_periodically(self):
+        dirty = self._dirty
+        while True:
+            dirty.wait()
+            dirty.clear()
+            self.write()
+            time.sleep(settings.METRICS_FLUSH_SECONDS)
+
+    def write(self):
+        """Replace this process's file in METRICS_DIR with its current values"""
+        if self._path is None or self._pid != os.getpid():
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomically(self._path, json.dumps({'pid': self._pid, 'metrics': self.snapshot()}))
+
+    def collect(self):
+        """Values of this process added to those the other processes last wrote"""
+        merged = self.snapshot()
+        if not settings.METRICS_DIR:
+            return merged
+
+        directory = Path(settings.METRICS_DIR)
+        with _directory_lock(directory):
+            self._fold_exited(directory)
+            for path in directory.glob('*.json'):
+                if path == self._path:
+                    continue
+                written = _read(path)
+                if written is None:
+                    continue
+                # The totals file has no pid, its gauges were dropped when it was written
+                alive = written['pid'] is None or _is_running(written['pid'])
+                self._add(merged, written['metrics'], gauges=alive)
+        return merged
+
+    def _fold_exited(self, directory):
+        """
+        Add the counters and histograms of exited workers to the totals file and
+        delete their files, so METRICS_DIR doesn't grow with every worker restart.
+        Callers hold the directory lock.
+        """
+        if fcntl is None:
+            return
+        exited = [
+            path for path in directory.glob('*-*.json')
+            if path != self._path and not _is_running(int(path.stem.split('-')[0]))
+        ]
+        if not exited:
+            return
+
+        totals_path = directory / TOTALS_FILE
+        totals = {name: {} for name in self.metrics}
+        written = _read(totals_path)
+        if written is not None:
+            self._add(totals, written['metrics'], gauges=False)
+        for path in exited:
+            written = _read(path)
+            if written is not None:
+                self._add(totals, written['metrics'], gauges=False)
+
+        _write_atomically(totals_path, json.dumps({'pid': None, 'metrics': totals}))
+        for path in exited:
+            path.unlink(missing_ok=True)
+
+    def _add(self, merged, metrics, gauges=True):
+        """Add written {metric name: values} to `merged`, gauges only when `gauges`"""
+        for name, values in metrics.items():
+            metric = self.metrics.get(name)
+            # Gauges of exited workers are stale, their counters still count
+            if metric is None or (metric.type == 'gauge' and not gauges):
+                continue
+            totals = merged[name]
+            for key, value in values.items():
+                if key not in totals:
+                    totals[key] = value
+                elif isinstance(value, list):
+                    totals[key] = [total + add for total, add in zip(totals[key], value)]
+                else:
+                    totals[key] += value
+
+    def exposition(self):
+        """Every metric in the Prometheus text exposition format"""
+        merged = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for suffix, labels, value in metric.samples(merged[name]):
+                label_text = ','.join(f'{label}="{_escape(text)}"' for label, text in labels.items())
+                if label_text:
+                    label_text = '{' + label_text + '}'
+                lines.append(f'{name}{suffix}{label_text} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+@contextlib.contextmanager
+def _directory_lock(directory):
+    """Lock across the scraping processes, so one folds the files of exited workers at a time"""
+    if fcntl is None:
+        yield
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / 'totals.lock', 'w') as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def _read(path):
+    """Contents of a metrics file, None when it is gone or half written"""
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomically(path, content):
+    with tempfile.NamedTemporaryFile('w', dir=path.parent, suffix='.tmp', delete=False) as file:
+        file.write(content)
+    os.replace(file.name, path)
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _escape(text):
+    return text.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+# Written once more at exit, so a worker's last counts outlive it
+atexit.register(REGISTRY.write)
+os.register_at_fork(after_in_child=REGISTRY.after_fork)
+
+
+http_requests = Counter(
+    'http_requests_total', 'API requests handled', ['view', 'method', 'status'],
+)
+http_request_duration = Histogram(
+    'http_request_duration_seconds', 'API request latency', ['view'],
+)
+http_request_queries = Histogram(
+    'http_request_queries', 'SQL queries per API request', ['view'], buckets=(1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+http_requests_in_progress = Gauge(
+    'http_requests_in_progress', 'API requests being handled right now',
+)
+phone_normalizations = Counter(
+    'phone_normalizations_total', 'normalize_phone_number calls', ['result'],
+)
+phone_normalization_duration = Histogram(
+    'phone_normalization_duration_seconds', 'normalize_phone_number latency', [],
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025),
+)
+cache_requests = Counter(
+    'cache_requests_total', 'Cache lookups by cache and result (hit or miss)', ['cache', 'result'],
+)
+
+
+def count_cache_lookups(cache_name, hits=0, misses=0):
+    """Add lookups of a cache to cache_requests_total"""
+    if hits:
+        cache_requests.inc(hits, cache=cache_name, result='hit')
+    if misses:
+        cache_requests.inc(misses, cache=cache_name, result='miss')
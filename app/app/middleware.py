@@ -0,0 +1,125 @@
+import contextlib
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connections
+
+from app import metrics as app_metrics
+from app.instrumentation import RequestMetrics, current_metrics
+from app.log import get_logger, request_id
+
+request_log = get_logger('app.requests')
+budget_log = get_logger('app.query_budget')
+
+# Ids accepted from an upstream proxy's X-Request-ID, anything else gets a fresh one
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+class RequestIdMiddleware:
+    """
+    Tags every log record of a request with one id, taken from the X-Request-ID
+    header when a proxy already assigned it, and returns it as X-Request-ID
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        incoming = request.headers.get('X-Request-ID', '')
+        request.id = incoming if REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(request.id)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id.reset(token)
+        response['X-Request-ID'] = request.id
+        return response
+
+
+def query_budget_for(request):
+    """
+    QUERY_BUDGETS entry of the matched URL name, else the query_budget of its view class.
+    Either is a number for every method or a {method: number} dict.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    if match.url_name in settings.QUERY_BUDGETS:
+        budget = settings.QUERY_BUDGETS[match.url_name]
+    else:
+        budget = getattr(getattr(match.func, 'view_class', None), 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(request.method)
+    return budget
+
+
+class RequestMetricsMiddleware:
+    """
+    Counts the SQL queries of every request and times them, the serializers and
+    the view. The timings go out as a Server-Timing header and an app.requests
+    log record; requests over their query budget also log a warning on
+    app.query_budget. Requests to the API views also feed the http_* metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        app_metrics.http_requests_in_progress.inc()
+        try:
+            with contextlib.ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            app_metrics.http_requests_in_progress.dec()
+            current_metrics.reset(token)
+        metrics.finish()
+
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = metrics.server_timing()
+        self.report(request, response, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+
+    def report(self, request, response, metrics):
+        match = getattr(request, 'resolver_match', None)
+        route = match.url_name if match else None
+        timings = {f'{name}_ms': ms for name, ms in metrics.timings().items()}
+        request_log.info(
+            'request',
+            method=request.method,
+            path=request.path,
+            route=route,
+            status=response.status_code,
+            queries=metrics.queries,
+            **timings,
+        )
+
+        view_class = getattr(getattr(match, 'func', None), 'view_class', None)
+        # Labelled by view class, so the series stay few whatever the ids in the paths
+        if view_class is not None and view_class.__module__.startswith('app.api.viewsets'):
+            view = view_class.__name__
+            app_metrics.http_requests.inc(view=view, method=request.method, status=response.status_code)
+            app_metrics.http_request_duration.observe(metrics.finished - metrics.started, view=view)
+            app_metrics.http_request_queries.observe(metrics.queries, view=view)
+
+        query_budget = query_budget_for(request)
+        if query_budget is not None and metrics.queries > query_budget:
+            budget_log.warning(
+                'query_budget_exceeded',
+                method=request.method,
+                path=request.path,
+                route=route,
+                queries=metrics.queries,
+                query_budget=query_budget,
+                **timings,
+            )
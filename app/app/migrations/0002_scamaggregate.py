@@ -0,0 +1,48 @@
+# Generated by Django 5.0.6 on 2026-10-17 16:21
+
+import uuid
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_scam_aggregates(apps, schema_editor):
+    ScamRecord = apps.get_model('app', 'ScamRecord')
+    ScamAggregate = apps.get_model('app', 'ScamAggregate')
+
+    stats = ScamRecord.objects.values('phone_number').annotate(
+        report_count=Count('id'),
+        unique_reporters=Count('reported_by', distinct=True),
+        latest_report_at=Max('created_at'),
+    ).order_by()
+    ScamAggregate.objects.bulk_create(
+        [ScamAggregate(id=uuid.uuid4(), **row) for row in stats],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScamAggregate',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created Date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated Date')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('phone_number', models.CharField(max_length=20, unique=True)),
+                ('report_count', models.PositiveIntegerField(default=0)),
+                ('unique_reporters', models.PositiveIntegerField(default=0)),
+                ('latest_report_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Spam Aggregate',
+                'verbose_name_plural': 'Spam Aggregates',
+                'db_table': 'scam_aggregates',
+            },
+        ),
+        migrations.RunPython(backfill_scam_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.0.6 on 2026-10-17 16:23
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Frozen copies of app.utils.normalize_name and name_trigrams, so this migration
+# keeps indexing the same way whatever happens to them later
+def normalize_name(name):
+    if not name:
+        return ''
+    chars = []
+    for char in unicodedata.normalize('NFKD', str(name).lower()):
+        if unicodedata.combining(char) and chars and chars[-1].isascii():
+            continue
+        chars.append(char if unicodedata.category(char)[0] in 'LNM' else ' ')
+    return ' '.join(''.join(chars).split())
+
+
+def name_trigrams(name):
+    trigrams = set()
+    for word in normalize_name(name).split():
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def backfill_name_index(apps, schema_editor):
+    NameIndexEntry = apps.get_model('app', 'NameIndexEntry')
+
+    for entity_type, model_name in (('user', 'User'), ('contact', 'Contact')):
+        model = apps.get_model('app', model_name)
+        batch = []
+        for obj in model.objects.only('id', 'first_name', 'last_name').order_by().iterator(chunk_size=2000):
+            batch.extend(
+                NameIndexEntry(gram=gram, entity_type=entity_type, entity_id=obj.pk)
+                for gram in name_trigrams(f"{obj.first_name} {obj.last_name}")
+            )
+            if len(batch) >= 5000:
+                NameIndexEntry.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            NameIndexEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_scamaggregate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NameIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=3)),
+                ('entity_type', models.CharField(choices=[('user', 'User'), ('contact', 'Contact')], max_length=10)),
+                ('entity_id', models.UUIDField()),
+            ],
+            options={
+                'verbose_name': 'Name Index Entry',
+                'verbose_name_plural': 'Name Index Entries',
+                'db_table': 'name_index',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='nameindexentry',
+            index=models.Index(fields=['entity_type', 'gram', 'entity_id'], name='name_index_entity__495451_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nameindexentry',
+            index=models.Index(fields=['entity_type', 'entity_id'], name='name_index_entity__9b9bbf_idx'),
+        ),
+        migrations.RunPython(backfill_name_index, migrations.RunPython.noop),
+    ]
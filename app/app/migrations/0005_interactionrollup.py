@@ -0,0 +1,63 @@
+# Generated by Django 5.0.6 on 2026-10-17 17:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+
+
+def backfill_interaction_rollups(apps, schema_editor):
+    Interaction = apps.get_model('app', 'Interaction')
+    InteractionRollup = apps.get_model('app', 'InteractionRollup')
+
+    outgoing = Interaction.objects.annotate(day=TruncDate('created_at')).values(
+        'initiator_id', 'day', 'interaction_type'
+    ).annotate(count=Count('id')).order_by()
+    incoming = Interaction.objects.exclude(receiver=None).exclude(receiver=F('initiator')).annotate(
+        day=TruncDate('created_at')
+    ).values('receiver_id', 'day', 'interaction_type').annotate(count=Count('id')).order_by()
+
+    InteractionRollup.objects.bulk_create(
+        [
+            InteractionRollup(user_id=row['initiator_id'], day=row['day'], interaction_type=row['interaction_type'],
+                              direction='outgoing', count=row['count'])
+            for row in outgoing
+        ] + [
+            InteractionRollup(user_id=row['receiver_id'], day=row['day'], interaction_type=row['interaction_type'],
+                              direction='incoming', count=row['count'])
+            for row in incoming
+        ],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_contactimportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InteractionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('interaction_type', models.CharField(max_length=20)),
+                ('direction', models.CharField(choices=[('outgoing', 'Outgoing'), ('incoming', 'Incoming')], max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interaction_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Interaction Rollup',
+                'verbose_name_plural': 'Interaction Rollups',
+                'db_table': 'interaction_rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='interactionrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'day', 'interaction_type', 'direction'), name='unique_interaction_rollup'),
+        ),
+        migrations.RunPython(backfill_interaction_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.6 on 2026-10-17 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_interactionrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpamLeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('bucket_start', models.DateField()),
+                ('phone_number', models.CharField(max_length=20)),
+                ('spam_count', models.PositiveIntegerField(default=0)),
+                ('unique_reporters', models.PositiveIntegerField(default=0)),
+                ('latest_report_at', models.DateTimeField()),
+                ('latest_description', models.CharField(blank=True, default='', max_length=500)),
+            ],
+            options={
+                'verbose_name': 'Spam Leaderboard Entry',
+                'verbose_name_plural': 'Spam Leaderboard Entries',
+                'db_table': 'spam_leaderboard',
+            },
+        ),
+        migrations.CreateModel(
+            name='SpamLeaderboardWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('processed_until', models.DateTimeField(blank=True, null=True)),
+                ('last_record_id', models.UUIDField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Spam Leaderboard Watermark',
+                'verbose_name_plural': 'Spam Leaderboard Watermark',
+                'db_table': 'spam_leaderboard_watermark',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='scamrecord',
+            index=models.Index(fields=['created_at', 'id'], name='scam_records_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='spamleaderboardentry',
+            constraint=models.UniqueConstraint(fields=('period', 'bucket_start', 'phone_number'), name='unique_spam_leaderboard_bucket'),
+        ),
+    ]
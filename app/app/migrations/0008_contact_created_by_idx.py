@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_nameconsensus'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['created_by', 'created_at', 'id'], name='contacts_created_by_idx'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.0.6 on 2026-10-17 18:30
+
+from itertools import groupby
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_contact_versions(apps, schema_editor):
+    Contact = apps.get_model('app', 'Contact')
+    ContactVersion = apps.get_model('app', 'ContactVersion')
+
+    # Existing contacts get versions 1..n per address book, oldest first
+    rows = Contact.objects.order_by('created_by_id', 'created_at', 'id').values_list('created_by_id', 'id')
+    versions = []
+    for user_id, user_rows in groupby(rows.iterator(chunk_size=5000), key=lambda row: row[0]):
+        contacts = [Contact(id=id, version=version) for version, (_, id) in enumerate(user_rows, start=1)]
+        Contact.objects.bulk_update(contacts, ['version'], batch_size=5000)
+        versions.append(ContactVersion(user_id=user_id, version=len(contacts)))
+    ContactVersion.objects.bulk_create(versions, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_contact_created_by_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ContactVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='contact_version', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('pruned_version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contact Version',
+                'verbose_name_plural': 'Contact Versions',
+                'db_table': 'contact_versions',
+            },
+        ),
+        migrations.CreateModel(
+            name='ContactTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contact_id', models.UUIDField()),
+                ('phone_number', models.CharField(max_length=20)),
+                ('version', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contact_tombstones', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Contact Tombstone',
+                'verbose_name_plural': 'Contact Tombstones',
+                'db_table': 'contact_tombstones',
+                'indexes': [
+                    models.Index(fields=['user', 'version'], name='contact_tombstones_version_idx'),
+                    models.Index(fields=['deleted_at'], name='contact_tombstones_deleted_idx'),
+                ],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['created_by', 'version'], name='contacts_version_idx'),
+        ),
+        migrations.RunPython(backfill_contact_versions, migrations.RunPython.noop),
+    ]
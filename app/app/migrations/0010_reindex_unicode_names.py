@@ -0,0 +1,57 @@
+# Generated by Django 5.0.6 on 2026-10-17 19:10
+
+import unicodedata
+
+from django.db import migrations
+
+
+# Frozen copies of app.utils.normalize_name and name_trigrams, so this migration
+# keeps indexing the same way whatever happens to them later
+def normalize_name(name):
+    if not name:
+        return ''
+    chars = []
+    for char in unicodedata.normalize('NFKD', str(name).lower()):
+        if unicodedata.combining(char) and chars and chars[-1].isascii():
+            continue
+        chars.append(char if unicodedata.category(char)[0] in 'LNM' else ' ')
+    return ' '.join(''.join(chars).split())
+
+
+def name_trigrams(name):
+    trigrams = set()
+    for word in normalize_name(name).split():
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def reindex_names(apps, schema_editor):
+    # Names outside a-z and 0-9 were indexed without their letters, so index everything again
+    NameIndexEntry = apps.get_model('app', 'NameIndexEntry')
+    NameIndexEntry.objects.all().delete()
+
+    for entity_type, model_name in (('user', 'User'), ('contact', 'Contact')):
+        model = apps.get_model('app', model_name)
+        batch = []
+        for obj in model.objects.only('id', 'first_name', 'last_name').order_by().iterator(chunk_size=2000):
+            batch.extend(
+                NameIndexEntry(gram=gram, entity_type=entity_type, entity_id=obj.pk)
+                for gram in name_trigrams(f"{obj.first_name} {obj.last_name}")
+            )
+            if len(batch) >= 5000:
+                NameIndexEntry.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            NameIndexEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_contactversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(reindex_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0.6 on 2026-10-17 19:20
+
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+
+
+# Frozen copy of app.utils.normalize_name, so this migration keeps grouping
+# spellings the same way whatever happens to it later
+def normalize_name(name):
+    if not name:
+        return ''
+    chars = []
+    for char in unicodedata.normalize('NFKD', str(name).lower()):
+        if unicodedata.combining(char) and chars and chars[-1].isascii():
+            continue
+        chars.append(char if unicodedata.category(char)[0] in 'LNM' else ' ')
+    return ' '.join(''.join(chars).split())
+
+
+def rebuild_name_consensus(apps, schema_editor):
+    # Names outside a-z and 0-9 cast no votes before, so count every vote again
+    Contact = apps.get_model('app', 'Contact')
+    NameConsensus = apps.get_model('app', 'NameConsensus')
+    NameConsensus.objects.all().delete()
+
+    votes = defaultdict(dict)
+    for row in Contact.objects.values('phone_number', 'first_name', 'last_name').annotate(count=Count('id')):
+        full_name = f"{row['first_name']} {row['last_name']}".strip()
+        key = normalize_name(full_name)
+        if key:
+            vote = votes[row['phone_number']].setdefault(key, {'name': full_name, 'votes': 0})
+            vote['votes'] += row['count']
+
+    consensus = []
+    for phone_number, phone_votes in votes.items():
+        ranked = sorted(phone_votes.values(), key=lambda vote: (-vote['votes'], vote['name']))
+        total = sum(vote['votes'] for vote in ranked)
+        consensus.append(NameConsensus(
+            phone_number=phone_number,
+            votes=phone_votes,
+            best_name=ranked[0]['name'],
+            best_votes=ranked[0]['votes'],
+            total_votes=total,
+            confidence=round(ranked[0]['votes'] / (total + settings.NAME_CONSENSUS_PRIOR_VOTES), 3),
+        ))
+    NameConsensus.objects.bulk_create(consensus, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_reindex_unicode_names'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_name_consensus, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-17 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_rebuild_name_consensus'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contactimportjob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=10),
+        ),
+    ]
@@ -1,7 +1,14 @@
 # Import in correct order to avoid circular dependencies
 from .user import User, CustomUserManager
 from .contact import Contact
+from .contact_version import ContactVersion, ContactTombstone
 from .scam import ScamRecord
+from .scam_aggregate import ScamAggregate
+from .spam_leaderboard import SpamLeaderboardEntry, SpamLeaderboardWatermark
 from .interaction import Interaction
+from .interaction_rollup import InteractionRollup
+from .name_index import NameIndexEntry
+from .name_consensus import NameConsensus
+from .contact_import import ContactImportJob
 
-__all__ = ['User', 'CustomUserManager', 'Contact', 'ScamRecord', 'Interaction']
\ No newline at end of file
+__all__ = ['User', 'CustomUserManager', 'Contact', 'ContactVersion', 'ContactTombstone', 'ScamRecord', 'ScamAggregate', 'SpamLeaderboardEntry', 'SpamLeaderboardWatermark', 'Interaction', 'InteractionRollup', 'NameIndexEntry', 'NameConsensus', 'ContactImportJob']
\ No newline at end of file
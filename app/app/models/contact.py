@@ -1,8 +1,135 @@
 from app.mixins import TimeStampModelMixin
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 import uuid
 
 
+class ContactManager(models.Manager):
+    """
+    Bulk write helpers for address-book syncs
+    """
+
+    def sync_for(self, user, entries, batch_size=1000):
+        """
+        Upsert {'phone_number', 'first_name', 'last_name'} entries into the contacts
+        of `user`, keyed on (phone_number, created_by). A later entry for the same
+        number wins over an earlier one.
+        Returns {'created', 'updated', 'unchanged', 'errors'}, where errors lists
+        {'index', 'phone_number', 'error'} for every entry that was skipped.
+        """
+        from app.caller_id import invalidate_caller_id
+        from app.models.contact_version import ContactVersion
+        from app.models.interaction import Interaction
+        from app.models.interaction_rollup import InteractionRollup
+        from app.models.name_consensus import NameConsensus
+        from app.models.name_index import NameIndexEntry
+        from app.utils import normalize_phone_numbers
+
+        entries = list(entries)
+        normalized, phone_errors = normalize_phone_numbers(entry.get('phone_number') for entry in entries)
+        max_name_length = self.model._meta.get_field('first_name').max_length
+
+        errors = []
+        names_by_phone = {}
+        for index, entry in enumerate(entries):
+            first_name = str(entry.get('first_name') or '').strip()
+            last_name = str(entry.get('last_name') or '').strip()
+            if index in phone_errors:
+                error = phone_errors[index]
+            elif not first_name:
+                error = "First name is required"
+            elif len(first_name) > max_name_length or len(last_name) > max_name_length:
+                error = f"Names can be at most {max_name_length} characters"
+            else:
+                names_by_phone[normalized[index]] = (first_name, last_name)
+                continue
+            errors.append({'index': index, 'phone_number': entry.get('phone_number'), 'error': error})
+
+        existing = {
+            contact.phone_number: contact
+            for contact in self.filter(created_by=user, phone_number__in=names_by_phone)
+            .only('id', 'phone_number', 'first_name', 'last_name')
+        }
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        name_votes = []
+        for phone_number, (first_name, last_name) in names_by_phone.items():
+            contact = existing.get(phone_number)
+            if contact is None:
+                to_create.append(self.model(
+                    phone_number=phone_number,
+                    first_name=first_name,
+                    last_name=last_name,
+                    created_by=user,
+                ))
+                name_votes.append((phone_number, f"{first_name} {last_name}", 1))
+            elif (contact.first_name, contact.last_name) != (first_name, last_name):
+                name_votes.append((phone_number, contact.get_full_name(), -1))
+                name_votes.append((phone_number, f"{first_name} {last_name}", 1))
+                contact.first_name = first_name
+                contact.last_name = last_name
+                contact.updated_by = user
+                contact.updated_at = now
+                to_update.append(contact)
+
+        with transaction.atomic():
+            if to_create or to_update:
+                first_version = ContactVersion.objects.allocate(user.id, len(to_create) + len(to_update))
+                for offset, contact in enumerate(to_create + to_update):
+                    contact.version = first_version + offset
+
+            # A concurrent sync may have inserted some of these numbers since the diff,
+            # in which case the database turns the insert into a name update
+            self.bulk_create(
+                to_create,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['phone_number', 'created_by'],
+                update_fields=['first_name', 'last_name', 'updated_at', 'version'],
+            )
+            self.bulk_update(
+                to_update, ['first_name', 'last_name', 'updated_by', 'updated_at', 'version'], batch_size=batch_size
+            )
+
+            # Conflicting inserts keep the id of the existing row, so ids are read back
+            created = list(
+                self.filter(created_by=user, phone_number__in=[contact.phone_number for contact in to_create])
+                .only('id', 'phone_number', 'first_name', 'last_name')
+            ) if to_create else []
+            NameIndexEntry.objects.index(NameIndexEntry.CONTACT, created + to_update)
+            # A conflicting insert counts as a new vote here; rebuild_name_consensus corrects it
+            NameConsensus.objects.record(name_votes)
+            # Bulk writes send no post_save, so the caller ID receivers never see them
+            invalidate_caller_id(contact.phone_number for contact in created + to_update)
+
+            # Audit trail, same as a single contact creation
+            interactions = Interaction.objects.bulk_create(
+                [
+                    Interaction(
+                        initiator=user,
+                        receiver_phone=contact.phone_number,
+                        interaction_type='contact_added',
+                        metadata={
+                            'contact_id': str(contact.id),
+                            'contact_name': contact.get_full_name(),
+                        },
+                    )
+                    for contact in created
+                ],
+                batch_size=batch_size,
+            )
+            InteractionRollup.objects.record(interactions)
+
+        return {
+            'created': len(to_create),
+            'updated': len(to_update),
+            'unchanged': len(names_by_phone) - len(to_create) - len(to_update),
+            'errors': errors,
+        }
+
+
 class Contact(TimeStampModelMixin):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     first_name = models.CharField(max_length=50)
@@ -10,6 +137,10 @@ class Contact(TimeStampModelMixin):
     phone_number = models.CharField(max_length=20, db_index=True)  # Changed from 10 to 20
     created_by = models.ForeignKey('User', on_delete=models.CASCADE, related_name='created_contacts')
     updated_by = models.ForeignKey('User', on_delete=models.SET_NULL, related_name='updated_contacts', null=True)
+    # Change version within the owner's address book, bumped on every write for delta syncs
+    version = models.PositiveBigIntegerField(default=0)
+
+    objects = ContactManager()
 
     def get_full_name(self):
         full_name = f"{self.first_name} {self.last_name}"
@@ -23,7 +154,48 @@ class Contact(TimeStampModelMixin):
                 self.phone_number = normalize_phone_number(self.phone_number)
             except:
                 pass  # Keep original if normalization fails
-        super().save(*args, **kwargs)
+        
+        from app.models.contact_version import ContactVersion
+        from app.models.name_consensus import NameConsensus
+        from app.models.name_index import NameIndexEntry
+        update_fields = kwargs.get('update_fields')
+        adding = self._state.adding
+        # Part of the caller's transaction when there is one, a savepoint would only add queries
+        with transaction.atomic(savepoint=False):
+            self.version = ContactVersion.objects.allocate(self.created_by_id)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version'}
+            # Renames and number changes move this contact's vote in the name consensus
+            previous = None if adding else (
+                Contact.objects.filter(pk=self.pk).values('phone_number', 'first_name', 'last_name').first()
+            )
+            super().save(*args, **kwargs)
+            if update_fields is None or {'first_name', 'last_name'} & set(update_fields):
+                NameIndexEntry.objects.index(NameIndexEntry.CONTACT, [self], replace=not adding)
+            if previous is None:
+                NameConsensus.objects.record([(self.phone_number, self.get_full_name(), 1)])
+            elif (previous['phone_number'], previous['first_name'], previous['last_name']) != (
+                self.phone_number, self.first_name, self.last_name
+            ):
+                NameConsensus.objects.record([
+                    (previous['phone_number'], f"{previous['first_name']} {previous['last_name']}", -1),
+                    (self.phone_number, self.get_full_name(), 1),
+                ])
+    
+    def delete(self, *args, **kwargs):
+        from app.models.contact_version import ContactVersion, ContactTombstone
+        from app.models.name_consensus import NameConsensus
+        from app.models.name_index import NameIndexEntry
+        with transaction.atomic():
+            ContactTombstone.objects.create(
+                user_id=self.created_by_id,
+                contact_id=self.pk,
+                phone_number=self.phone_number,
+                version=ContactVersion.objects.allocate(self.created_by_id),
+            )
+            NameIndexEntry.objects.remove(NameIndexEntry.CONTACT, [self.pk])
+            NameConsensus.objects.record([(self.phone_number, self.get_full_name(), -1)])
+            return super().delete(*args, **kwargs)
     
     def __str__(self):
         return f"{self.get_full_name()} - {self.phone_number}"
@@ -37,4 +209,10 @@ class Contact(TimeStampModelMixin):
                 fields=["phone_number", "created_by"],
                 name="unique_phone_number_created_by",
             ),
+        ]
+        indexes = [
+            # Keyset pagination of an address book, newest first
+            models.Index(fields=['created_by', 'created_at', 'id'], name='contacts_created_by_idx'),
+            # Delta sync: changes of one address book since a version
+            models.Index(fields=['created_by', 'version'], name='contacts_version_idx'),
         ]
\ No newline at end of file
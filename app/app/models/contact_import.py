@@ -0,0 +1,77 @@
+from app.mixins import TimeStampModelMixin
+from django.db import models
+from django.utils import timezone
+import uuid
+
+
+class ContactImportJob(TimeStampModelMixin):
+    """
+    Progress of one streamed contact import.
+    Counters are saved after every committed batch, so the job can be polled
+    while the upload is still running. Jobs created ahead of their upload wait
+    as pending until it starts.
+    """
+
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+    FORMATS = [
+        (NDJSON, 'NDJSON'),
+        (CSV, 'CSV'),
+    ]
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (COMPLETED, 'Completed'),
+        (FAILED, 'Failed'),
+    ]
+
+    # Only the first errors are kept, error_count has the total
+    MAX_STORED_ERRORS = 100
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey('User', on_delete=models.CASCADE, related_name='contact_imports')
+    format = models.CharField(max_length=10, choices=FORMATS)
+    status = models.CharField(max_length=10, choices=STATUSES, default=RUNNING)
+    rows_processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    unchanged_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def record_batch(self, rows, result):
+        """Add the outcome of one Contact.objects.sync_for() batch, error indexes offset by rows already done"""
+        for error in result['errors']:
+            if len(self.errors) >= self.MAX_STORED_ERRORS:
+                break
+            self.errors.append({**error, 'index': self.rows_processed + error['index']})
+
+        self.rows_processed += rows
+        self.created_count += result['created']
+        self.updated_count += result['updated']
+        self.unchanged_count += result['unchanged']
+        self.error_count += len(result['errors'])
+        self.save()
+
+    def finish(self, status, error=None):
+        if error is not None and len(self.errors) < self.MAX_STORED_ERRORS:
+            self.errors.append({'index': self.rows_processed, 'phone_number': None, 'error': error})
+            self.error_count += 1
+        self.status = status
+        self.finished_at = timezone.now()
+        self.save()
+
+    def __str__(self):
+        return f"{self.format} import by {self.created_by_id}: {self.status}"
+
+    class Meta:
+        db_table = 'contact_import_jobs'
+        verbose_name = 'Contact Import Job'
+        verbose_name_plural = 'Contact Import Jobs'
+        ordering = ['-created_at']
@@ -0,0 +1,115 @@
+from django.db import connection, models, transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
+
+
+class ContactVersionManager(models.Manager):
+    """
+    Per-user change version counters behind the contacts delta sync
+    """
+
+    def allocate(self, user_id, count=1):
+        """
+        Reserve `count` consecutive change versions for the contacts of a user and
+        return the first. The counter row stays locked until the transaction commits,
+        so a user's versions become visible in increasing order.
+        Must run inside the transaction that writes the contacts.
+        """
+        # One upsert creates or bumps the counter and reads it back (SQLite 3.35+, PostgreSQL)
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (user_id, version, pruned_version) VALUES (%s, %s, 0) "
+                f"ON CONFLICT (user_id) DO UPDATE SET version = {table}.version + excluded.version "
+                f"RETURNING version",
+                [self.model._meta.get_field('user').get_db_prep_value(user_id, connection), count],
+            )
+            return cursor.fetchone()[0] - count + 1
+
+    def stamp_unversioned(self, batch_size=5000):
+        """
+        Give contacts written by bulk inserts, which skip Contact.save(), their
+        change versions, oldest first. Returns the number of contacts stamped.
+        """
+        from app.models.contact import Contact
+
+        unversioned = Contact.objects.filter(version=0)
+        total = 0
+        for user_id in list(unversioned.values_list('created_by_id', flat=True).distinct()):
+            with transaction.atomic():
+                ids = list(
+                    unversioned.filter(created_by_id=user_id).order_by('created_at', 'id').values_list('id', flat=True)
+                )
+                if not ids:
+                    continue
+                first = self.allocate(user_id, len(ids))
+                Contact.objects.bulk_update(
+                    [Contact(id=id, version=first + offset) for offset, id in enumerate(ids)],
+                    ['version'],
+                    batch_size=batch_size,
+                )
+            total += len(ids)
+        return total
+
+
+class ContactVersion(models.Model):
+    """
+    Last change version handed out for the contacts of a user, and the highest
+    version whose tombstones were pruned. A delta sync from before that version
+    can no longer see every delete and has to start over.
+    """
+    user = models.OneToOneField('User', on_delete=models.CASCADE, primary_key=True, related_name='contact_version')
+    version = models.PositiveBigIntegerField(default=0)
+    pruned_version = models.PositiveBigIntegerField(default=0)
+
+    objects = ContactVersionManager()
+
+    def __str__(self):
+        return f"{self.user_id}: v{self.version}"
+
+    class Meta:
+        db_table = 'contact_versions'
+        verbose_name = 'Contact Version'
+        verbose_name_plural = 'Contact Versions'
+
+
+class ContactTombstoneManager(models.Manager):
+
+    def prune(self, before):
+        """
+        Delete tombstones of contacts deleted before `before`, remembering per user
+        the highest version pruned. Returns the number of tombstones deleted.
+        """
+        stale = self.filter(deleted_at__lt=before)
+        with transaction.atomic():
+            for row in stale.values('user_id').annotate(max_version=Max('version')).order_by():
+                ContactVersion.objects.filter(user_id=row['user_id']).update(
+                    pruned_version=Greatest(F('pruned_version'), row['max_version'])
+                )
+            deleted, _ = stale.delete()
+        return deleted
+
+
+class ContactTombstone(models.Model):
+    """
+    A deleted contact, kept so delta syncs can tell clients to drop it
+    """
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='contact_tombstones')
+    contact_id = models.UUIDField()
+    phone_number = models.CharField(max_length=20)
+    version = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ContactTombstoneManager()
+
+    def __str__(self):
+        return f"{self.contact_id} deleted at v{self.version}"
+
+    class Meta:
+        db_table = 'contact_tombstones'
+        verbose_name = 'Contact Tombstone'
+        verbose_name_plural = 'Contact Tombstones'
+        indexes = [
+            models.Index(fields=['user', 'version'], name='contact_tombstones_version_idx'),
+            models.Index(fields=['deleted_at'], name='contact_tombstones_deleted_idx'),
+        ]
@@ -1,8 +1,64 @@
 from app.mixins import TimeStampModelMixin
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Q, Value, When
 import uuid
 
 
+class InteractionManager(models.Manager):
+
+    def top_contacts_for(self, user, limit):
+        """
+        The numbers a user initiated most interactions with, as dicts with
+        name, phone, count and is_registered, in three queries whatever the limit.
+        Interactions with a registered receiver are grouped by the receiver, so
+        differently formatted numbers of the same user count together.
+        Other numbers are named after the user's own contact, or shown as is.
+        """
+        from app.models.contact import Contact
+        from app.models.user import User
+
+        top = list(
+            self.filter(initiator=user)
+            .values(
+                'receiver_id',
+                phone_key=Case(When(receiver__isnull=False, then=Value('')), default=F('receiver_phone')),
+            )
+            .annotate(count=Count('id'))
+            .order_by('-count', 'receiver_id', 'phone_key')[:limit]
+        )
+
+        receiver_ids = [row['receiver_id'] for row in top if row['receiver_id']]
+        phones = [row['phone_key'] for row in top if not row['receiver_id']]
+        users = User.objects.filter(Q(id__in=receiver_ids) | Q(phone_number__in=phones)) if top else []
+        users_by_id = {registered.id: registered for registered in users}
+        users_by_phone = {registered.phone_number: registered for registered in users_by_id.values()}
+
+        unregistered = [phone for phone in phones if phone not in users_by_phone]
+        contact_names = {}
+        if unregistered:
+            for contact in Contact.objects.filter(created_by=user, phone_number__in=unregistered):
+                contact_names.setdefault(contact.phone_number, f"{contact.first_name} {contact.last_name}".strip())
+
+        # Numbers saved before their owner registered fold into that user's row
+        # (within the fetched groups, so such a user can rank lower than their total)
+        merged = {}
+        for row in top:
+            registered = users_by_id.get(row['receiver_id']) or users_by_phone.get(row['phone_key'])
+            key = registered.id if registered else row['phone_key']
+            if key in merged:
+                merged[key]['count'] += row['count']
+                continue
+            phone = registered.phone_number if registered else row['phone_key']
+            merged[key] = {
+                'name': registered.get_full_name() if registered else contact_names.get(phone) or phone,
+                'phone': phone,
+                'count': row['count'],
+                'is_registered': registered is not None,
+            }
+        results = sorted(merged.values(), key=lambda contact: -contact['count'])
+        return results
+
+
 class Interaction(TimeStampModelMixin):
     """
     Model to track user interactions (calls, messages, spam reports)
@@ -40,6 +96,30 @@ class Interaction(TimeStampModelMixin):
     # JSON field for metadata (call duration, message content, etc.)
     metadata = models.JSONField(default=dict, blank=True)
     
+    objects = InteractionManager()
+    
+    def save(self, *args, **kwargs):
+        from app.models.interaction_rollup import InteractionRollup
+        # Part of the caller's transaction when there is one, a savepoint would only add queries
+        with transaction.atomic(savepoint=False):
+            if self._state.adding:
+                super().save(*args, **kwargs)
+                InteractionRollup.objects.record([self])
+            else:
+                # Edits may move the interaction to another day, type or receiver
+                previous = Interaction.objects.filter(pk=self.pk).first()
+                super().save(*args, **kwargs)
+                if previous is not None:
+                    InteractionRollup.objects.record([previous], sign=-1)
+                InteractionRollup.objects.record([self])
+    
+    def delete(self, *args, **kwargs):
+        from app.models.interaction_rollup import InteractionRollup
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            InteractionRollup.objects.record([self], sign=-1)
+        return result
+    
     def __str__(self):
         receiver_info = self.receiver.phone_number if self.receiver else self.receiver_phone
         return f"{self.initiator.phone_number} -> {receiver_info} ({self.interaction_type})"
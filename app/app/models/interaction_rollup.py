@@ -0,0 +1,91 @@
+from collections import Counter
+from django.db import connection, models
+from django.db.models import F
+from django.utils import timezone
+
+
+class InteractionRollupManager(models.Manager):
+    """
+    Incremental maintenance of the per-user daily interaction counts
+    """
+
+    @staticmethod
+    def keys_for(interaction):
+        """(user_id, day, interaction_type, direction) of every rollup row an interaction counts in"""
+        day = timezone.localdate(interaction.created_at)
+        keys = [(interaction.initiator_id, day, interaction.interaction_type, InteractionRollup.OUTGOING)]
+        # Interactions with yourself count once, like the Q(initiator) | Q(receiver) filter did
+        if interaction.receiver_id and interaction.receiver_id != interaction.initiator_id:
+            keys.append((interaction.receiver_id, day, interaction.interaction_type, InteractionRollup.INCOMING))
+        return keys
+
+    def record(self, interactions, sign=1):
+        """
+        Add (or with sign=-1 remove) the given saved interactions to the rollups.
+        Must run inside the transaction that wrote the interactions.
+        """
+        counts = Counter(key for interaction in interactions for key in self.keys_for(interaction))
+        for (user_id, day, interaction_type, direction), count in counts.items():
+            self._add(user_id, day, interaction_type, direction, sign * count)
+
+    def _add(self, user_id, day, interaction_type, direction, amount):
+        rows = self.filter(user_id=user_id, day=day, interaction_type=interaction_type, direction=direction)
+        if amount < 0:
+            rows.update(count=F('count') + amount)
+            rows.filter(count__lte=0).delete()
+            return
+
+        # One upsert creates or increments the row (SQLite 3.24+, PostgreSQL)
+        meta = self.model._meta
+        table = connection.ops.quote_name(meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (user_id, day, interaction_type, direction, count) "
+                f"VALUES (%s, %s, %s, %s, %s) "
+                f"ON CONFLICT (user_id, day, interaction_type, direction) "
+                f"DO UPDATE SET count = {table}.count + excluded.count",
+                [
+                    meta.get_field('user').get_db_prep_value(user_id, connection),
+                    meta.get_field('day').get_db_prep_value(day, connection),
+                    interaction_type,
+                    direction,
+                    amount,
+                ],
+            )
+
+
+class InteractionRollup(models.Model):
+    """
+    Interactions per user, local day, type and direction, kept in sync by
+    Interaction.save()/delete(), so the dashboard reads O(days) rows
+    instead of the user's whole interaction history
+    """
+
+    OUTGOING = 'outgoing'
+    INCOMING = 'incoming'
+    DIRECTIONS = [
+        (OUTGOING, 'Outgoing'),
+        (INCOMING, 'Incoming'),
+    ]
+
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name='interaction_rollups')
+    day = models.DateField()
+    interaction_type = models.CharField(max_length=20)
+    direction = models.CharField(max_length=10, choices=DIRECTIONS)
+    count = models.PositiveIntegerField(default=0)
+
+    objects = InteractionRollupManager()
+
+    def __str__(self):
+        return f"{self.user_id} {self.day} {self.interaction_type}/{self.direction}: {self.count}"
+
+    class Meta:
+        db_table = 'interaction_rollups'
+        verbose_name = 'Interaction Rollup'
+        verbose_name_plural = 'Interaction Rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'day', 'interaction_type', 'direction'],
+                name='unique_interaction_rollup',
+            ),
+        ]
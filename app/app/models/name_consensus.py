@@ -0,0 +1,127 @@
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import models, transaction, IntegrityError
+from app.utils import normalize_name
+
+
+class NameConsensusManager(models.Manager):
+    """
+    Incremental maintenance of the crowd-sourced name votes per number
+    """
+
+    def record(self, votes):
+        """
+        Apply (phone_number, full_name, +1 or -1) votes, one per contact added,
+        removed or renamed. Spellings that normalize alike share their votes.
+        Must run inside the transaction that wrote the contacts.
+        """
+        deltas = defaultdict(Counter)
+        spellings = {}
+        for phone_number, full_name, sign in votes:
+            key = normalize_name(full_name)
+            if not phone_number or not key:
+                continue
+            deltas[phone_number][key] += sign
+            spellings.setdefault((phone_number, key), full_name.strip())
+        # Renames between spellings of the same name cancel out
+        deltas = {
+            phone_number: Counter({key: delta for key, delta in counter.items() if delta})
+            for phone_number, counter in deltas.items()
+        }
+        deltas = {phone_number: counter for phone_number, counter in deltas.items() if counter}
+        if not deltas:
+            return
+
+        # Only inserts can collide with another transaction, so only they need a savepoint
+        to_create = self._apply(deltas, spellings)
+        if not to_create:
+            return
+        try:
+            with transaction.atomic():
+                self.bulk_create(to_create, batch_size=1000)
+        except IntegrityError:
+            # Another transaction created some of the rows first - apply to those rows instead
+            phone_numbers = {consensus.phone_number for consensus in to_create}
+            retry = {phone_number: deltas[phone_number] for phone_number in phone_numbers}
+            self.bulk_create(self._apply(retry, spellings), batch_size=1000)
+
+    def _apply(self, deltas, spellings):
+        """Update and delete the rows of existing numbers, returns the unsaved rows of new ones"""
+        existing = {
+            consensus.phone_number: consensus
+            for consensus in self.select_for_update().filter(phone_number__in=deltas)
+        }
+
+        to_create = []
+        to_update = []
+        to_delete = []
+        for phone_number, counter in deltas.items():
+            consensus = existing.get(phone_number) or NameConsensus(phone_number=phone_number, votes={})
+            for key, delta in counter.items():
+                vote = consensus.votes.get(key) or {'name': spellings[(phone_number, key)], 'votes': 0}
+                vote['votes'] += delta
+                if vote['votes'] > 0:
+                    consensus.votes[key] = vote
+                else:
+                    consensus.votes.pop(key, None)
+            consensus.tally()
+
+            if consensus.pk is None:
+                if consensus.votes:
+                    to_create.append(consensus)
+            elif consensus.votes:
+                to_update.append(consensus)
+            else:
+                to_delete.append(consensus.pk)
+
+        self.bulk_update(
+            to_update,
+            ['votes', 'best_name', 'best_votes', 'total_votes', 'confidence'],
+            batch_size=1000,
+        )
+        self.filter(pk__in=to_delete).delete()
+        return to_create
+
+
+class NameConsensus(models.Model):
+    """
+    Names a number is saved under across all address books, with their vote
+    counts, kept in sync by Contact.save()/delete() and Contact.objects.sync_for(),
+    so identifying an unregistered number reads one row instead of every contact
+    """
+    phone_number = models.CharField(max_length=20, unique=True)
+    best_name = models.CharField(max_length=101)
+    best_votes = models.PositiveIntegerField(default=0)
+    total_votes = models.PositiveIntegerField(default=0)
+    confidence = models.FloatField(default=0)
+    # {normalized name: {'name': a spelling of it, 'votes': contacts}}
+    votes = models.JSONField(default=dict)
+
+    objects = NameConsensusManager()
+
+    def ranked_votes(self):
+        return sorted(self.votes.values(), key=lambda vote: (-vote['votes'], vote['name']))
+
+    def top_names(self):
+        """Best NAME_CONSENSUS_TOP_NAMES names as [{'name', 'votes'}, ...], most votes first"""
+        return [dict(vote) for vote in self.ranked_votes()[:settings.NAME_CONSENSUS_TOP_NAMES]]
+
+    def tally(self):
+        """
+        Recompute the best name and its confidence from the votes. Confidence is
+        the best name's share of the votes, damped by NAME_CONSENSUS_PRIOR_VOTES
+        so a number saved by one person doesn't look certain.
+        """
+        ranked = self.ranked_votes()
+        self.best_name = ranked[0]['name'] if ranked else ''
+        self.best_votes = ranked[0]['votes'] if ranked else 0
+        self.total_votes = sum(vote['votes'] for vote in ranked)
+        self.confidence = round(self.best_votes / (self.total_votes + settings.NAME_CONSENSUS_PRIOR_VOTES), 3)
+
+    def __str__(self):
+        return f"{self.phone_number}: {self.best_name} ({self.best_votes}/{self.total_votes})"
+
+    class Meta:
+        db_table = 'name_consensus'
+        verbose_name = 'Name Consensus'
+        verbose_name_plural = 'Name Consensus'
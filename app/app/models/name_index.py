@@ -0,0 +1,88 @@
+from django.db import models
+from django.db.models import Count
+from app.utils import name_trigrams
+
+
+class NameIndexManager(models.Manager):
+    """
+    Maintenance and lookup helpers for the trigram name index
+    """
+
+    def index(self, entity_type, objs, batch_size=5000, replace=True):
+        """
+        (Re)index the full names of the given users or contacts.
+        Existing entries of those objects are replaced; pass replace=False
+        for objects just created, which have none.
+        """
+        objs = list(objs)
+        if not objs:
+            return
+
+        if replace:
+            self.remove(entity_type, [obj.pk for obj in objs])
+        self.bulk_create(self.entries_for(entity_type, objs), batch_size=batch_size)
+
+    def entries_for(self, entity_type, objs):
+        """Unsaved index rows for the names of the given objects"""
+        return [
+            NameIndexEntry(gram=gram, entity_type=entity_type, entity_id=obj.pk)
+            for obj in objs
+            for gram in name_trigrams(f"{obj.first_name} {obj.last_name}")
+        ]
+
+    def remove(self, entity_type, entity_ids, batch_size=1000):
+        entity_ids = list(entity_ids)
+        for start in range(0, len(entity_ids), batch_size):
+            self.filter(
+                entity_type=entity_type,
+                entity_id__in=entity_ids[start:start + batch_size],
+            ).delete()
+
+    def candidates(self, query, entity_type, limit):
+        """
+        Top `limit` entities of one type by the number of trigrams their name
+        shares with the query, as [{'entity_id': ..., 'hits': ...}, ...]
+        """
+        grams = name_trigrams(query)
+        if not grams:
+            return []
+
+        return list(
+            self.filter(entity_type=entity_type, gram__in=grams)
+            .values('entity_id')
+            .annotate(hits=Count('id'))
+            .order_by('-hits', 'entity_id')[:limit]
+        )
+
+
+class NameIndexEntry(models.Model):
+    """
+    Inverted trigram index over normalized user and contact names.
+    One row per (trigram, entity), so name search is an index range scan
+    instead of a leading-wildcard icontains over users and contacts.
+    """
+
+    USER = 'user'
+    CONTACT = 'contact'
+    ENTITY_TYPES = [
+        (USER, 'User'),
+        (CONTACT, 'Contact'),
+    ]
+
+    gram = models.CharField(max_length=3)
+    entity_type = models.CharField(max_length=10, choices=ENTITY_TYPES)
+    entity_id = models.UUIDField()
+
+    objects = NameIndexManager()
+
+    def __str__(self):
+        return f"{self.gram!r} -> {self.entity_type}:{self.entity_id}"
+
+    class Meta:
+        db_table = 'name_index'
+        verbose_name = 'Name Index Entry'
+        verbose_name_plural = 'Name Index Entries'
+        indexes = [
+            models.Index(fields=['entity_type', 'gram', 'entity_id']),
+            models.Index(fields=['entity_type', 'entity_id']),
+        ]
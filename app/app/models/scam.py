@@ -1,7 +1,10 @@
 from app.mixins import TimeStampModelMixin
-from django.db import models
+from django.db import models, transaction
 import uuid
 
+# scam_records values the spam leaderboard counts a report with
+LEADERBOARD_FIELDS = ('id', 'phone_number', 'reported_by_id', 'created_at', 'description')
+
 
 class ScamRecord(TimeStampModelMixin):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -18,7 +21,33 @@ class ScamRecord(TimeStampModelMixin):
                 self.phone_number = normalize_phone_number(self.phone_number)
             except:
                 pass
-        super().save(*args, **kwargs)
+
+        from app.models.scam_aggregate import ScamAggregate
+        from app.models.spam_leaderboard import SpamLeaderboardEntry
+        with transaction.atomic():
+            if self._state.adding:
+                super().save(*args, **kwargs)
+                ScamAggregate.objects.record_report(self.phone_number, self.reported_by_id, self.created_at)
+            else:
+                # Edits may move the report to another number or change its reporter
+                previous = ScamRecord.objects.filter(pk=self.pk).values(*LEADERBOARD_FIELDS).first()
+                super().save(*args, **kwargs)
+                ScamAggregate.objects.refresh_for({previous['phone_number'] if previous else None, self.phone_number})
+                if previous is not None:
+                    SpamLeaderboardEntry.objects.revise(
+                        previous, {field: getattr(self, field) for field in LEADERBOARD_FIELDS}
+                    )
+
+    def delete(self, *args, **kwargs):
+        from app.models.scam_aggregate import ScamAggregate
+        from app.models.spam_leaderboard import SpamLeaderboardEntry
+        with transaction.atomic():
+            previous = ScamRecord.objects.filter(pk=self.pk).values(*LEADERBOARD_FIELDS).first()
+            result = super().delete(*args, **kwargs)
+            ScamAggregate.objects.refresh_for({self.phone_number})
+            if previous is not None:
+                SpamLeaderboardEntry.objects.revise(previous, None)
+        return result
     
     def __str__(self):
         return f"Spam: {self.phone_number}"
@@ -32,4 +61,8 @@ class ScamRecord(TimeStampModelMixin):
                 fields=["reported_by", "phone_number"],
                 name="unique_phone_number_reported_by",
             ),
+        ]
+        indexes = [
+            # Keyset scan of the spam leaderboard refresh
+            models.Index(fields=['created_at', 'id'], name='scam_records_created_idx'),
         ]
\ No newline at end of file
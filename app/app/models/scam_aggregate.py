@@ -0,0 +1,126 @@
+from app.mixins import TimeStampModelMixin
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, F, Max
+from django.db.models.functions import Greatest
+import uuid
+
+
+class ScamAggregateManager(models.Manager):
+    """
+    Read/write helpers for the denormalized per-number spam counts
+    """
+
+    def counts_for(self, phone_numbers):
+        """
+        Return {phone_number: report_count} for every given number in one query.
+        Numbers that were never reported map to 0.
+        """
+        from app import metrics
+        from app.spam_filter import reported_numbers
+
+        phone_numbers = {phone for phone in phone_numbers if phone}
+        counts = dict.fromkeys(phone_numbers, 0)
+        # Numbers the filter has definitely never seen reported skip the query
+        candidates = {phone for phone in phone_numbers if reported_numbers.might_contain(phone)}
+        metrics.count_cache_lookups(
+            'spam_filter', hits=len(phone_numbers) - len(candidates), misses=len(candidates)
+        )
+        if not candidates:
+            return counts
+
+        counts.update(
+            self.filter(phone_number__in=candidates).values_list('phone_number', 'report_count')
+        )
+        return counts
+
+    def count_for(self, phone_number):
+        return self.counts_for([phone_number]).get(phone_number, 0)
+
+    def record_report(self, phone_number, reported_by_id, reported_at):
+        """
+        Add a single new report to the aggregate of its phone number.
+        Must run inside the transaction that inserted the ScamRecord.
+        """
+        from app.spam_filter import reported_numbers
+
+        reported_numbers.add(phone_number)
+        reporter_increment = 1 if reported_by_id else 0
+
+        updated = self.filter(phone_number=phone_number).update(
+            report_count=F('report_count') + 1,
+            unique_reporters=F('unique_reporters') + reporter_increment,
+            latest_report_at=Greatest('latest_report_at', reported_at),
+        )
+        if updated:
+            return
+
+        try:
+            with transaction.atomic():
+                self.create(
+                    phone_number=phone_number,
+                    report_count=1,
+                    unique_reporters=reporter_increment,
+                    latest_report_at=reported_at,
+                )
+        except IntegrityError:
+            # Another transaction created the row first - fall back to incrementing it
+            self.record_report(phone_number, reported_by_id, reported_at)
+
+    def refresh_for(self, phone_numbers):
+        """
+        Recompute the aggregates of the given numbers from scam_records.
+        Used when reports are edited or deleted, where increments are not enough.
+        """
+        from app.models.scam import ScamRecord
+        from app.spam_filter import reported_numbers
+
+        phone_numbers = {phone for phone in phone_numbers if phone}
+        if not phone_numbers:
+            return
+
+        stats = {
+            row['phone_number']: row
+            for row in ScamRecord.objects.filter(phone_number__in=phone_numbers)
+            .values('phone_number')
+            .annotate(
+                report_count=Count('id'),
+                unique_reporters=Count('reported_by', distinct=True),
+                latest_report_at=Max('created_at'),
+            )
+        }
+
+        # Edits can move reports to new numbers; removed numbers stay in the filter as false positives
+        for phone_number in stats:
+            reported_numbers.add(phone_number)
+        self.filter(phone_number__in=phone_numbers - stats.keys()).delete()
+        for phone_number, row in stats.items():
+            self.update_or_create(
+                phone_number=phone_number,
+                defaults={
+                    'report_count': row['report_count'],
+                    'unique_reporters': row['unique_reporters'],
+                    'latest_report_at': row['latest_report_at'],
+                },
+            )
+
+
+class ScamAggregate(TimeStampModelMixin):
+    """
+    Per-number spam summary kept in sync with ScamRecord,
+    so spam likelihood lookups never have to COUNT scam_records
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    phone_number = models.CharField(max_length=20, unique=True)
+    report_count = models.PositiveIntegerField(default=0)
+    unique_reporters = models.PositiveIntegerField(default=0)
+    latest_report_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ScamAggregateManager()
+
+    def __str__(self):
+        return f"{self.phone_number}: {self.report_count} reports"
+
+    class Meta:
+        db_table = 'scam_aggregates'
+        verbose_name = 'Spam Aggregate'
+        verbose_name_plural = 'Spam Aggregates'
@@ -0,0 +1,299 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _next_month(day):
+    return (_month_start(day) + timedelta(days=32)).replace(day=1)
+
+
+class SpamLeaderboardManager(models.Manager):
+    """
+    Incremental maintenance of, and bucket lookups on, the spam leaderboard
+    """
+
+    @staticmethod
+    def buckets_for(day):
+        """(period, bucket_start) of every bucket a report made on the given local day counts in"""
+        return [
+            (SpamLeaderboardEntry.DAY, day),
+            (SpamLeaderboardEntry.WEEK, day - timedelta(days=day.weekday())),
+            (SpamLeaderboardEntry.MONTH, _month_start(day)),
+        ]
+
+    def bucket_filter(self, start=None, end=None):
+        """
+        Q selecting the buckets that exactly cover the local days start..end, both
+        inclusive and either one None for an open range. Whole months use month
+        buckets, the edges around them week buckets and then day buckets, so a
+        range costs at most a dozen buckets per number on top of its months.
+        """
+        first_month = None if start is None else (start if start.day == 1 else _next_month(start))
+        months_end = None if end is None else _month_start(end + timedelta(days=1))
+        if first_month is not None and months_end is not None and first_month >= months_end:
+            return self._fine_bucket_filter(start, end)
+
+        buckets = Q(period=SpamLeaderboardEntry.MONTH)
+        if first_month is not None:
+            buckets &= Q(bucket_start__gte=first_month)
+        if months_end is not None:
+            buckets &= Q(bucket_start__lt=months_end)
+        if start is not None and start < first_month:
+            buckets |= self._fine_bucket_filter(start, first_month - timedelta(days=1))
+        if end is not None and months_end <= end:
+            buckets |= self._fine_bucket_filter(months_end, end)
+        return buckets
+
+    @staticmethod
+    def _fine_bucket_filter(start, end):
+        weeks = []
+        week = start + timedelta(days=(7 - start.weekday()) % 7)
+        while week + timedelta(days=6) <= end:
+            weeks.append(week)
+            week += timedelta(days=7)
+
+        if weeks:
+            days = [start + timedelta(days=i) for i in range((weeks[0] - start).days)]
+            days += [week + timedelta(days=i) for i in range((end - week).days + 1)]
+        else:
+            days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+        buckets = Q(period=SpamLeaderboardEntry.DAY, bucket_start__in=days)
+        if weeks:
+            buckets |= Q(period=SpamLeaderboardEntry.WEEK, bucket_start__in=weeks)
+        return buckets
+
+    @staticmethod
+    def bucket_end(period, bucket_start):
+        """First local day after a bucket"""
+        if period == SpamLeaderboardEntry.DAY:
+            return bucket_start + timedelta(days=1)
+        if period == SpamLeaderboardEntry.WEEK:
+            return bucket_start + timedelta(days=7)
+        return _next_month(bucket_start)
+
+    def record(self, reports, sign=1):
+        """
+        Add (or with sign=-1 remove) the given scam_records rows (dicts with
+        phone_number, reported_by_id, created_at and description) to their buckets.
+        Must run inside the transaction that advances or locks the watermark.
+        """
+        # A reporter can report a number only once, so reporter counts add up across batches and buckets
+        deltas = {}
+        for report in reports:
+            for period, bucket_start in self.buckets_for(timezone.localdate(report['created_at'])):
+                delta = deltas.setdefault((period, bucket_start, report['phone_number']), [0, 0, None, ''])
+                delta[0] += sign
+                delta[1] += sign if report['reported_by_id'] else 0
+                if sign > 0 and (delta[2] is None or report['created_at'] >= delta[2]):
+                    delta[2], delta[3] = report['created_at'], report['description']
+
+        existing = {}
+        for period in {key[0] for key in deltas}:
+            keys = [key for key in deltas if key[0] == period]
+            existing.update(
+                ((entry.period, entry.bucket_start, entry.phone_number), entry)
+                for entry in self.filter(
+                    period=period,
+                    bucket_start__in={key[1] for key in keys},
+                    phone_number__in={key[2] for key in keys},
+                )
+            )
+
+        to_create = []
+        to_update = []
+        to_delete = []
+        for (period, bucket_start, phone_number), (count, reporters, latest_at, description) in deltas.items():
+            entry = existing.get((period, bucket_start, phone_number))
+            if entry is None:
+                if count <= 0:
+                    continue
+                to_create.append(SpamLeaderboardEntry(
+                    period=period,
+                    bucket_start=bucket_start,
+                    phone_number=phone_number,
+                    spam_count=count,
+                    unique_reporters=reporters,
+                    latest_report_at=latest_at,
+                    latest_description=description,
+                ))
+                continue
+
+            if entry.spam_count + count <= 0:
+                to_delete.append(entry.pk)
+                continue
+            entry.spam_count += count
+            entry.unique_reporters = max(entry.unique_reporters + reporters, 0)
+            if latest_at is not None and latest_at >= entry.latest_report_at:
+                entry.latest_report_at, entry.latest_description = latest_at, description
+            to_update.append(entry)
+
+        self.bulk_create(to_create, batch_size=1000)
+        self.bulk_update(
+            to_update,
+            ['spam_count', 'unique_reporters', 'latest_report_at', 'latest_description'],
+            batch_size=1000,
+        )
+        self.filter(pk__in=to_delete).delete()
+
+    def revise(self, previous, current):
+        """
+        Keep the buckets of a report the leaderboard already counts in step with an
+        edit or delete of it. `previous` and `current` are its scam_records values
+        before and after (dicts as record() takes, plus id), `current` None once
+        deleted. Reports past the watermark are left to refresh(), which reads them
+        as they are by then. Must run inside the transaction that wrote the report.
+        """
+        from app.models.scam import ScamRecord
+
+        watermark = SpamLeaderboardWatermark.objects.select_for_update().filter(pk=1).first()
+        if watermark is None or not watermark.covers(previous['created_at'], previous['id']):
+            return
+
+        self.record([previous], sign=-1)
+        # The removed report may have been the latest of its buckets
+        for period, bucket_start in self.buckets_for(timezone.localdate(previous['created_at'])):
+            entry = self.filter(
+                period=period, bucket_start=bucket_start, phone_number=previous['phone_number']
+            ).first()
+            if entry is None:
+                continue
+            latest = ScamRecord.objects.filter(
+                watermark.includes(),
+                phone_number=entry.phone_number,
+                created_at__date__gte=bucket_start,
+                created_at__date__lt=self.bucket_end(period, bucket_start),
+            ).exclude(pk=previous['id']).order_by('-created_at').values('created_at', 'description').first()
+            if latest is not None:
+                entry.latest_report_at, entry.latest_description = latest['created_at'], latest['description']
+                entry.save(update_fields=['latest_report_at', 'latest_description'])
+
+        if current is not None:
+            self.record([current])
+
+    def refresh(self, batch_size=5000, settle_seconds=None):
+        """
+        Fold scam_records rows past the watermark into the leaderboard, oldest first,
+        one transaction per batch. Rows younger than settle_seconds are left for the
+        next run, so reports still being committed are not skipped by the watermark.
+        Returns the number of reports processed.
+        """
+        from app.models.scam import ScamRecord
+
+        if settle_seconds is None:
+            settle_seconds = settings.SPAM_LEADERBOARD_SETTLE_SECONDS
+        cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+
+        total = 0
+        while True:
+            with transaction.atomic():
+                watermark, _ = SpamLeaderboardWatermark.objects.select_for_update().get_or_create(pk=1)
+
+                reports = ScamRecord.objects.filter(created_at__lte=cutoff)
+                if watermark.processed_until is not None:
+                    reports = reports.filter(
+                        Q(created_at__gt=watermark.processed_until)
+                        | Q(created_at=watermark.processed_until, id__gt=watermark.last_record_id)
+                    )
+                batch = list(
+                    reports.order_by('created_at', 'id').values(
+                        'id', 'phone_number', 'reported_by_id', 'created_at', 'description'
+                    )[:batch_size]
+                )
+
+                if batch:
+                    self.record(batch)
+                    watermark.processed_until = batch[-1]['created_at']
+                    watermark.last_record_id = batch[-1]['id']
+                watermark.refreshed_at = timezone.now()
+                watermark.save()
+
+            total += len(batch)
+            if len(batch) < batch_size:
+                return total
+
+    def rebuild(self, batch_size=5000, settle_seconds=None):
+        """Drop the leaderboard and its watermark and fold in every report again"""
+        with transaction.atomic():
+            self.all().delete()
+            SpamLeaderboardWatermark.objects.all().delete()
+        return self.refresh(batch_size=batch_size, settle_seconds=settle_seconds)
+
+
+class SpamLeaderboardEntry(models.Model):
+    """
+    Spam reports per number and day/week/month bucket, refreshed incrementally by
+    the refresh_spam_leaderboard command, so spam stats over a date range sum a
+    few buckets per number instead of scanning scam_records
+    """
+
+    DAY = 'day'
+    WEEK = 'week'
+    MONTH = 'month'
+    PERIODS = [
+        (DAY, 'Day'),
+        (WEEK, 'Week'),
+        (MONTH, 'Month'),
+    ]
+
+    period = models.CharField(max_length=5, choices=PERIODS)
+    bucket_start = models.DateField()
+    phone_number = models.CharField(max_length=20)
+    spam_count = models.PositiveIntegerField(default=0)
+    unique_reporters = models.PositiveIntegerField(default=0)
+    latest_report_at = models.DateTimeField()
+    latest_description = models.CharField(max_length=500, blank=True, default='')
+
+    objects = SpamLeaderboardManager()
+
+    def __str__(self):
+        return f"{self.phone_number} {self.period} {self.bucket_start}: {self.spam_count}"
+
+    class Meta:
+        db_table = 'spam_leaderboard'
+        verbose_name = 'Spam Leaderboard Entry'
+        verbose_name_plural = 'Spam Leaderboard Entries'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['period', 'bucket_start', 'phone_number'],
+                name='unique_spam_leaderboard_bucket',
+            ),
+        ]
+
+
+class SpamLeaderboardWatermark(models.Model):
+    """
+    Single row holding the (created_at, id) of the last scam_records row
+    folded into the leaderboard
+    """
+    processed_until = models.DateTimeField(null=True, blank=True)
+    last_record_id = models.UUIDField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    def covers(self, created_at, record_id):
+        """Whether the scam_records row with this created_at and id is folded in"""
+        if self.processed_until is None:
+            return False
+        return (created_at, record_id) <= (self.processed_until, self.last_record_id)
+
+    def includes(self):
+        """Q matching the scam_records rows already folded into the leaderboard"""
+        if self.processed_until is None:
+            return Q(pk__in=[])
+        return Q(created_at__lt=self.processed_until) | Q(
+            created_at=self.processed_until, id__lte=self.last_record_id
+        )
+
+    def __str__(self):
+        return f"Spam leaderboard up to {self.processed_until}"
+
+    class Meta:
+        db_table = 'spam_leaderboard_watermark'
+        verbose_name = 'Spam Leaderboard Watermark'
+        verbose_name_plural = 'Spam Leaderboard Watermark'
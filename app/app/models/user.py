@@ -1,5 +1,5 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
-from django.db import models
+from django.db import models, transaction
 from app.mixins import TimeStampModelMixin
 import uuid
 
@@ -78,6 +78,23 @@ class User(AbstractBaseUser, PermissionsMixin, TimeStampModelMixin):
     def __str__(self):
         return f"{self.get_full_name()} ({self.phone_number})"
     
+    def save(self, *args, **kwargs):
+        from app.models.name_index import NameIndexEntry
+        update_fields = kwargs.get('update_fields')
+        adding = self._state.adding
+        # Part of the caller's transaction when there is one, a savepoint would only add queries
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            # Skip re-indexing for partial saves such as last_login updates
+            if update_fields is None or {'first_name', 'last_name'} & set(update_fields):
+                NameIndexEntry.objects.index(NameIndexEntry.USER, [self], replace=not adding)
+    
+    def delete(self, *args, **kwargs):
+        from app.models.name_index import NameIndexEntry
+        with transaction.atomic():
+            NameIndexEntry.objects.remove(NameIndexEntry.USER, [self.pk])
+            return super().delete(*args, **kwargs)
+    
     def get_full_name(self):
         """
         Return the first_name plus the last_name, with a space in between.
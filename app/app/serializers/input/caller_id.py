@@ -0,0 +1,14 @@
+from django.conf import settings
+from rest_framework import serializers
+
+
+class CallerIdBatchInputSerializer(serializers.Serializer):
+    """
+    Numbers of a call log or SMS inbox. Each one is normalized during the lookup,
+    so an invalid number is reported instead of rejecting the batch.
+    """
+    phone_numbers = serializers.ListField(
+        child=serializers.CharField(max_length=30, allow_blank=True),
+        allow_empty=False,
+        max_length=settings.CALLER_ID_BATCH_MAX
+    )
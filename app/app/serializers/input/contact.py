@@ -1,5 +1,6 @@
+from django.conf import settings
 from rest_framework import serializers
-from app.models import Contact
+from app.models import Contact, ContactImportJob
 from app.utils import normalize_phone_number
 
 
@@ -27,4 +28,21 @@ class CreateContactInputSerializer(serializers.Serializer):
         Create the contact instance
         THIS METHOD WAS MISSING - CRITICAL FIX
         """
-        return Contact.objects.create(**validated_data)
\ No newline at end of file
+        return Contact.objects.create(**validated_data)
+
+
+class SyncContactsInputSerializer(serializers.Serializer):
+    """
+    Whole address book upload. Entries are validated one by one during the sync,
+    so a bad entry is reported instead of rejecting the batch.
+    """
+    contacts = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.CONTACT_SYNC_MAX_BATCH
+    )
+
+
+class CreateContactImportInputSerializer(serializers.Serializer):
+    """Import job created ahead of its upload, so its id is known while the body streams"""
+    format = serializers.ChoiceField(choices=ContactImportJob.FORMATS)
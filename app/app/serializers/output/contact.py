@@ -1,9 +1,11 @@
 from rest_framework import serializers
 from app.models.contact import Contact
-from app.models.scam import ScamRecord
+from app.models.contact_version import ContactTombstone
+from app.models.contact_import import ContactImportJob
+from app.serializers.output.scam import SpamLikelihoodMixin, SpamLikelihoodListSerializer
 
 
-class ContactOutputSerializer(serializers.ModelSerializer):
+class ContactOutputSerializer(SpamLikelihoodMixin, serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     spam_likelihood = serializers.SerializerMethodField()
 
@@ -18,10 +20,66 @@ class ContactOutputSerializer(serializers.ModelSerializer):
             'spam_likelihood',
             'created_at',
         )
+        list_serializer_class = SpamLikelihoodListSerializer
 
-    def get_spam_likelihood(self, obj: Contact):
-        count = ScamRecord.objects.filter(phone_number=obj.phone_number).count()
-        return count
+    # Model fields each output field reads, for loading only what a projection needs
+    SOURCE_FIELDS = {
+        'full_name': ('first_name', 'last_name'),
+        'spam_likelihood': ('phone_number',),
+    }
+
+    def __init__(self, *args, fields=None, **kwargs):
+        """`fields` limits the output to the given field names"""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    @classmethod
+    def source_fields(cls, fields):
+        """Model fields to load for rendering the given output fields"""
+        return {
+            source
+            for field_name in fields
+            for source in cls.SOURCE_FIELDS.get(field_name, (field_name,))
+        }
 
     def get_full_name(self, obj: Contact):
-        return obj.get_full_name()
\ No newline at end of file
+        return obj.get_full_name()
+
+
+class ContactChangeOutputSerializer(ContactOutputSerializer):
+
+    class Meta(ContactOutputSerializer.Meta):
+        fields = ContactOutputSerializer.Meta.fields + ('updated_at', 'version')
+
+
+class ContactTombstoneOutputSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(source='contact_id')
+
+    class Meta:
+        model = ContactTombstone
+        fields = (
+            'id',
+            'phone_number',
+            'version',
+        )
+
+
+class ContactImportJobOutputSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = ContactImportJob
+        fields = (
+            'id',
+            'format',
+            'status',
+            'rows_processed',
+            'created_count',
+            'updated_count',
+            'unchanged_count',
+            'error_count',
+            'errors',
+            'created_at',
+            'finished_at',
+        )
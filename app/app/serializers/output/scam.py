@@ -1,9 +1,41 @@
 from rest_framework import serializers
+from django.db import models
 from app.models.scam import ScamRecord
+from app.models.scam_aggregate import ScamAggregate
 from app.serializers.output.user import UserOutputSerializer
 
 
-class ScamRecordOutputSerializer(serializers.ModelSerializer):
+class SpamLikelihoodListSerializer(serializers.ListSerializer):
+    """
+    Looks up the spam counts of every item in one query before
+    the child serializer renders them
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if 'spam_likelihood' not in self.child.fields:
+            return super().to_representation(items)
+        spam_counts = self.context.setdefault('spam_counts', {})
+        spam_counts.update(
+            ScamAggregate.objects.counts_for(getattr(item, 'phone_number', None) for item in items)
+        )
+        return super().to_representation(items)
+
+
+class SpamLikelihoodMixin:
+    """
+    get_spam_likelihood() that reads the batched counts from the context,
+    falling back to a single lookup for one-off serialization
+    """
+
+    def get_spam_likelihood(self, obj):
+        spam_counts = self.context.get('spam_counts', {})
+        if obj.phone_number in spam_counts:
+            return spam_counts[obj.phone_number]
+        return ScamAggregate.objects.count_for(obj.phone_number)
+
+
+class ScamRecordOutputSerializer(SpamLikelihoodMixin, serializers.ModelSerializer):
     reported_by = UserOutputSerializer(read_only=True)
     spam_likelihood = serializers.SerializerMethodField()
     
@@ -18,6 +50,4 @@ class ScamRecordOutputSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at'
         )
-
-    def get_spam_likelihood(self, obj: ScamRecord):
-        return ScamRecord.objects.filter(phone_number=obj.phone_number).count()
\ No newline at end of file
+        list_serializer_class = SpamLikelihoodListSerializer
\ No newline at end of file
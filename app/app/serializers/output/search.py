@@ -1,10 +1,10 @@
 from rest_framework import serializers
 from app.models.user import User
 from app.models.contact import Contact
-from app.models.scam import ScamRecord
+from app.serializers.output.scam import SpamLikelihoodMixin, SpamLikelihoodListSerializer
 
 
-class SearchOutputSerializer(serializers.Serializer):
+class SearchOutputSerializer(SpamLikelihoodMixin, serializers.Serializer):
     id = serializers.UUIDField()
     name = serializers.SerializerMethodField()
     phone_number = serializers.CharField()
@@ -12,6 +12,9 @@ class SearchOutputSerializer(serializers.Serializer):
     spam_likelihood = serializers.SerializerMethodField()
     match_score = serializers.IntegerField(required=False, default=0)
 
+    class Meta:
+        list_serializer_class = SpamLikelihoodListSerializer
+
     def get_name(self, obj):
         if isinstance(obj, User) or isinstance(obj, Contact):
             return obj.get_full_name()
@@ -22,12 +25,11 @@ class SearchOutputSerializer(serializers.Serializer):
 
     def get_spam_likelihood(self, obj):
         if isinstance(obj, User) or isinstance(obj, Contact):
-            phone_number = obj.phone_number
-            return ScamRecord.objects.filter(phone_number=phone_number).count()
+            return super().get_spam_likelihood(obj)
         return 0
 
 
-class SearchDetailsUserOutputSerializer(serializers.ModelSerializer):
+class SearchDetailsUserOutputSerializer(SpamLikelihoodMixin, serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     spam_likelihood = serializers.SerializerMethodField()
     email = serializers.SerializerMethodField()
@@ -43,9 +45,7 @@ class SearchDetailsUserOutputSerializer(serializers.ModelSerializer):
             'email',
             'spam_likelihood',
         )
-
-    def get_spam_likelihood(self, obj: User):
-        return ScamRecord.objects.filter(phone_number=obj.phone_number).count()
+        list_serializer_class = SpamLikelihoodListSerializer
 
     def get_full_name(self, obj: User):
         return obj.get_full_name()
@@ -63,7 +63,7 @@ class SearchDetailsUserOutputSerializer(serializers.ModelSerializer):
         return None
 
 
-class SearchDetailsContactOutputSerializer(serializers.ModelSerializer):
+class SearchDetailsContactOutputSerializer(SpamLikelihoodMixin, serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
     spam_likelihood = serializers.SerializerMethodField()
 
@@ -77,9 +77,7 @@ class SearchDetailsContactOutputSerializer(serializers.ModelSerializer):
             'phone_number',
             'spam_likelihood',
         )
-
-    def get_spam_likelihood(self, obj: Contact):
-        return ScamRecord.objects.filter(phone_number=obj.phone_number).count()
+        list_serializer_class = SpamLikelihoodListSerializer
 
     def get_full_name(self, obj: Contact):
         return obj.get_full_name()
\ No newline at end of file
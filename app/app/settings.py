@@ -46,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app.middleware.RequestIdMiddleware',  # First, so every log record of a request has its id
+    'app.middleware.RequestMetricsMiddleware',  # Next, so its total covers every other middleware
     'corsheaders.middleware.CorsMiddleware',  # MUST be near the top
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -228,6 +230,9 @@ CORS_ALLOW_HEADERS = [
 CORS_EXPOSE_HEADERS = [
     'Content-Type',
     'X-CSRFToken',
+    'X-Request-ID',
+    'Server-Timing',
+    'Link',
 ]
 
 # Preflight cache duration (in seconds)
@@ -240,39 +245,45 @@ PHONENUMBER_DEFAULT_FORMAT = 'E164'  # International format
 
 
 # Logging Configuration
+# Level of the app loggers. DEBUG also logs request payloads (passwords masked).
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+# Records waiting for the background log writer. When it falls this far
+# behind, new records are dropped and counted instead of blocking requests.
+LOG_QUEUE_SIZE = 10000
+# Share of records below ERROR kept per logger (and its children), for high-volume events
+LOG_SAMPLE_RATES = {
+    'django.request': 0.1,  # 4xx warnings, one per rejected request
+    # 'app.requests': 0.1,  # one record per request, with its queries and timings
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
-    'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {message}',
-            'style': '{',
-        },
-        'simple': {
-            'format': '{levelname} {message}',
-            'style': '{',
+    'filters': {
+        'sampling': {
+            '()': 'app.log.SamplingFilter',
+            'rates': LOG_SAMPLE_RATES,
         },
     },
     'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'simple',
-        },
-        'file': {
-            'class': 'logging.FileHandler',
+        # JSON lines to debug.log and short lines to the console, written by a background thread
+        'background': {
+            '()': 'app.log.BackgroundHandler',
             'filename': BASE_DIR / 'debug.log',
-            'formatter': 'verbose',
+            'stream': 'ext://sys.stderr',
+            'queue_size': LOG_QUEUE_SIZE,
+            'filters': ['sampling'],
         },
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['background'],
             'level': 'INFO',
-            'propagate': True,
+            'propagate': False,
         },
         'app': {
-            'handlers': ['console', 'file'],
-            'level': 'DEBUG',
+            'handlers': ['background'],
+            'level': LOG_LEVEL,
             'propagate': False,
         },
     },
@@ -348,6 +359,101 @@ ADMIN_INDEX_TITLE = "Welcome to Spam Detection Administration"
 PAGINATE_BY = 10
 
 
+# Phone numbers
+# Max distinct (number, region) pairs memoized by normalize_phone_number
+PHONE_NORMALIZATION_CACHE_SIZE = 10000
+# Distinct numbers a normalize_phone_numbers batch needs before it uses a process pool
+PHONE_BATCH_PARALLEL_THRESHOLD = 20000
+
+
+# Contacts
+# Max entries accepted by one address-book sync request
+CONTACT_SYNC_MAX_BATCH = 10000
+# Rows committed per transaction by streamed contact imports
+CONTACT_IMPORT_BATCH_SIZE = 1000
+# Contacts per /api/contact page, and the largest allowed ?limit=
+CONTACTS_PAGE_SIZE = 100
+CONTACTS_MAX_LIMIT = 1000
+# Changes per /api/contact/changes page, and the largest allowed ?limit=
+CONTACT_CHANGES_PAGE_SIZE = 500
+CONTACT_CHANGES_MAX_LIMIT = 5000
+# Days tombstones of deleted contacts are kept for delta syncs, see prune_contact_tombstones.
+# Clients that last synced before that have to start over.
+CONTACT_TOMBSTONE_RETENTION_DAYS = 90
+
+
+# Request metrics
+# Send each request's query count and db/serializer/view/total times as a
+# Server-Timing header. Clients can read it, so turn it off if that matters.
+SERVER_TIMING_HEADER = True
+# Max SQL queries per URL name, overriding the query_budget of the view: a number,
+# or a {method: number} dict. Requests over budget log a query_budget_exceeded warning.
+QUERY_BUDGETS = {}
+
+
+# Metrics
+# Prometheus metrics at /api/metrics. Set METRICS_DIR (a local directory, emptied on
+# deploy) when running several worker processes: each writes its values there every
+# METRICS_FLUSH_SECONDS and a scrape adds them up. Without it a scrape only shows
+# the process that answered it.
+METRICS_DIR = None
+METRICS_FLUSH_SECONDS = 5
+# Addresses that may scrape without a token, e.g. ['10.0.0.5']; anyone else needs a staff JWT.
+# Matched against REMOTE_ADDR, so behind a local proxy such as nginx every request comes
+# from 127.0.0.1: never list the proxy's address, or /api/metrics is public.
+METRICS_ALLOWED_IPS = []
+
+
+# Spam filter
+# Bloom filter of reported numbers, so lookups of never-reported numbers skip the database.
+# Set SPAM_FILTER_PATH (e.g. BASE_DIR / 'spam_filter.bin') to enable it: all worker processes
+# share that memory-mapped file, built in the background when missing. Run rebuild_spam_filter
+# after restoring the database. Without it every lookup queries the database.
+SPAM_FILTER_PATH = None
+SPAM_FILTER_ERROR_RATE = 0.01
+SPAM_FILTER_MIN_CAPACITY = 100000
+
+
+# Caller ID
+# Numbers kept in each process's in-memory caller ID cache, and for how many seconds.
+# Invalidations only reach the process that handled the write, so keep this short.
+CALLER_ID_LOCAL_CACHE_SIZE = 100000
+CALLER_ID_LOCAL_CACHE_TIMEOUT = 5
+# Seconds a caller ID stays in the shared cache, writes touching the number drop it earlier
+CALLER_ID_CACHE_TIMEOUT = 3600
+# Max numbers per batch caller ID request (a call log or SMS inbox page)
+CALLER_ID_BATCH_MAX = 500
+
+
+# Name consensus
+# Names listed per number, and votes added to the total when computing confidence
+NAME_CONSENSUS_TOP_NAMES = 5
+NAME_CONSENSUS_PRIOR_VOTES = 2
+
+
+# Dashboard
+# Seconds a user's dashboard data stays cached, writes touching the user drop it earlier
+DASHBOARD_CACHE_TIMEOUT = 60
+
+
+# Spam stats
+# Numbers per /api/interactions/spam-stats page, and the largest allowed ?limit=
+SPAM_STATS_PAGE_SIZE = 50
+SPAM_STATS_MAX_LIMIT = 500
+# Reports younger than this are left for the next spam leaderboard refresh,
+# so rows of transactions still committing are not skipped by the watermark
+SPAM_LEADERBOARD_SETTLE_SECONDS = 30
+
+
+# Search
+# Max users/contacts taken from the trigram name index and fuzzy-scored per name search
+SEARCH_CANDIDATE_LIMIT = 200
+# Candidate rows fetched per round trip while ranking name matches
+SEARCH_FETCH_CHUNK_SIZE = 50
+# Seconds the full ranking of a name query is cached for cursor pagination
+SEARCH_CACHE_TIMEOUT = 120
+
+
 # API Rate Limiting (optional - requires django-ratelimit)
 # RATELIMIT_ENABLE = True
 # RATELIMIT_USE_CACHE = 'default'
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.api.viewsets.dashboard import invalidate_dashboard_cache
+from app.caller_id import invalidate_caller_id
+from app.models.contact import Contact
+from app.models.interaction import Interaction
+from app.models.scam import ScamRecord
+from app.models.user import User
+
+
+@receiver([post_save, post_delete], sender=Interaction)
+def interaction_changed(sender, instance, **kwargs):
+    """Both sides of an interaction see it on their dashboard"""
+    invalidate_dashboard_cache([instance.initiator_id, instance.receiver_id])
+
+
+@receiver([post_save, post_delete], sender=ScamRecord)
+def scam_record_changed(sender, instance, **kwargs):
+    """The reporter's "reported" count and the reported user's "received" count change"""
+    reported_user_ids = User.objects.filter(phone_number=instance.phone_number).values_list('id', flat=True)
+    invalidate_dashboard_cache([instance.reported_by_id, *reported_user_ids])
+    invalidate_caller_id([instance.phone_number])
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    """A signup or name change replaces the crowd-sourced name of the number"""
+    invalidate_caller_id([instance.phone_number])
+
+
+@receiver([post_save, post_delete], sender=Contact)
+def contact_changed(sender, instance, **kwargs):
+    """Every contact is a vote for the best name of its number"""
+    invalidate_caller_id([instance.phone_number])
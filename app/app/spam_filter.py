@@ -0,0 +1,259 @@
+"""
+Probabilistic precheck for "was this number ever reported as spam".
+Most looked-up numbers never were, and a Bloom filter of every reported number
+answers that without touching the database: "no" is always right, "maybe" falls
+through to the ScamAggregate query. The filter lives in a memory-mapped file at
+SPAM_FILTER_PATH that all worker processes share and start warm from.
+"""
+import contextlib
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from app.log import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+log = get_logger(__name__)
+
+
+class BloomFilter:
+    """
+    Bloom filter over strings, backed by a bytearray or a shared memory-mapped file.
+    Positions come from double hashing one blake2b digest, so a lookup costs
+    one hash however many positions are probed.
+    """
+
+    MAGIC = b'SPAMBLM1'
+    HEADER = struct.Struct('<8sQQ')  # magic, bits, hashes
+
+    def __init__(self, bits, hashes, buffer=None, offset=0, file=None):
+        self.bits = bits
+        self.hashes = hashes
+        self._buffer = buffer if buffer is not None else bytearray((bits + 7) // 8)
+        self._offset = offset
+        self._file = file
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate):
+        """Empty filter sized for `capacity` keys at the given false positive rate"""
+        capacity = max(capacity, 1)
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = max(1, round(bits / capacity * math.log(2)))
+        return cls(bits, hashes)
+
+    def _positions(self, key):
+        first, second = struct.unpack('<QQ', hashlib.blake2b(key.encode(), digest_size=16).digest())
+        second |= 1
+        return ((first + i * second) % self.bits for i in range(self.hashes))
+
+    def add(self, key):
+        # Setting a bit is a read-modify-write of its byte, so processes sharing a file take turns
+        if self._file is not None and fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            for position in self._positions(key):
+                index = self._offset + (position >> 3)
+                self._buffer[index] |= 1 << (position & 7)
+        finally:
+            if self._file is not None and fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def __contains__(self, key):
+        return all(
+            self._buffer[self._offset + (position >> 3)] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    def save(self, path):
+        """Write the filter to `path` atomically, readers keep the file they mapped"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.bits, self.hashes))
+            file.write(bytes(self._buffer[self._offset:self._offset + (self.bits + 7) // 8]))
+        os.replace(file.name, path)
+
+    def close(self):
+        """Unmap a filter opened from a file; lookups on it raise ValueError afterwards"""
+        if self._file is not None:
+            self._buffer.close()
+            self._file.close()
+
+    @classmethod
+    def open(cls, path):
+        """Map a saved filter shared and writable, so adds are seen by every process mapping it"""
+        file = open(path, 'r+b')
+        buffer = mmap.mmap(file.fileno(), 0)
+        magic, bits, hashes = cls.HEADER.unpack_from(buffer)
+        if magic != cls.MAGIC:
+            raise ValueError(f'{path} is not a spam filter file')
+        return cls(bits, hashes, buffer=buffer, offset=cls.HEADER.size, file=file)
+
+
+class ReportedNumbers:
+    """
+    The process-wide filter of reported numbers, mapped from SPAM_FILTER_PATH.
+    The file is re-checked every second and remapped once a rebuild replaced it.
+    While there is no file yet, one thread builds it in the background and
+    lookups answer "maybe", so they fall through to the database. Without
+    SPAM_FILTER_PATH there is no filter at all: a copy per process would miss
+    the reports made in other processes.
+    """
+
+    FILE_CHECK_SECONDS = 1
+
+    def __init__(self):
+        self._filter = None
+        self._file_id = None
+        self._checked_at = 0
+        self._building = False
+        self._lock = threading.Lock()
+
+    def might_contain(self, phone_number):
+        bloom = self._current()
+        if bloom is None:
+            return True
+        try:
+            return phone_number in bloom
+        except ValueError:
+            # Another thread closed this mapping after remapping a rebuilt file
+            return True
+
+    def add(self, phone_number):
+        if not settings.SPAM_FILTER_PATH:
+            return
+        self._add(phone_number)
+        # A rebuild that replaces the file before the report commits can't see it in
+        # the database, so add it again to whatever file is current once it committed
+        transaction.on_commit(lambda: self._add(phone_number))
+
+    def _add(self, phone_number):
+        with self._lock:
+            # Adds are rare, so they always check for the current file, even right after a rebuild
+            self._checked_at = 0
+        bloom = self._current()
+        if bloom is None:
+            return
+        try:
+            bloom.add(phone_number)
+        except ValueError:
+            # Closed by another thread remapping a rebuilt file, add to that one instead
+            with self._lock:
+                self._checked_at = 0
+            self._current().add(phone_number)
+
+    def rebuild(self):
+        """Rebuild the shared file from ScamAggregate, None without SPAM_FILTER_PATH"""
+        from app.models.scam_aggregate import ScamAggregate
+
+        path = settings.SPAM_FILTER_PATH
+        if not path:
+            return None
+
+        started = timezone.now()
+        phone_numbers = ScamAggregate.objects.values_list('phone_number', flat=True)
+        bloom = BloomFilter.for_capacity(
+            max(settings.SPAM_FILTER_MIN_CAPACITY, 2 * phone_numbers.count()),
+            settings.SPAM_FILTER_ERROR_RATE,
+        )
+        for phone_number in phone_numbers.iterator(chunk_size=10000):
+            bloom.add(phone_number)
+        bloom.save(path)
+
+        with self._lock:
+            self._checked_at = 0
+        # Reports made while scanning may have gone to the replaced file only
+        for phone_number in ScamAggregate.objects.filter(
+            latest_report_at__gte=started - timedelta(seconds=5)
+        ).values_list('phone_number', flat=True):
+            self._add(phone_number)
+        return bloom
+
+    def reset(self):
+        """Forget the mapped filter, the next lookup maps the file again"""
+        with self._lock:
+            if self._filter is not None:
+                self._filter.close()
+            self._filter = None
+            self._file_id = None
+            self._checked_at = 0
+
+    def _current(self):
+        """The mapped filter, or None while there is none to trust"""
+        path = settings.SPAM_FILTER_PATH
+        if not path:
+            return None
+        now = time.monotonic()
+        bloom = self._filter
+        if bloom is not None and now - self._checked_at < self.FILE_CHECK_SECONDS:
+            return bloom
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._build_in_background()
+            return None
+        with self._lock:
+            if self._filter is None or self._file_id != (stat.st_dev, stat.st_ino):
+                if self._filter is not None:
+                    self._filter.close()
+                self._filter = BloomFilter.open(path)
+                self._file_id = (stat.st_dev, stat.st_ino)
+            self._checked_at = now
+            return self._filter
+
+    def _build_in_background(self):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._build, name='spam-filter-build', daemon=True).start()
+
+    def _build(self):
+        try:
+            with _build_lock(settings.SPAM_FILTER_PATH) as acquired:
+                # Another process already building it saves the same file
+                if acquired and not os.path.exists(settings.SPAM_FILTER_PATH):
+                    self.rebuild()
+        except Exception:
+            log.exception('spam_filter_build_failed', path=str(settings.SPAM_FILTER_PATH))
+        finally:
+            connection.close()
+            with self._lock:
+                self._building = False
+
+
+@contextlib.contextmanager
+def _build_lock(path):
+    """Non-blocking lock across processes, yields whether it was acquired"""
+    if fcntl is None:
+        yield True
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f'{path}.lock', 'w') as file:
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+reported_numbers = ReportedNumbers()
@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from app.api.viewsets.dashboard import DashboardView
+from app.api.viewsets.interaction import TopContactsView
+from app.models import Contact, Interaction, User
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Query counts of the dashboard and top contacts, at their views' query_budget.
+    Interactions with a registered user, a saved contact and an unknown number
+    make top_contacts_for() run all three of its queries.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            phone_number='9876543210', first_name='Rahul', last_name='Kumar', password='secret'
+        )
+        friend = User.objects.create_user(
+            phone_number='9876543211', first_name='Priya', last_name='Shah', password='secret'
+        )
+        Contact.objects.create(created_by=self.user, phone_number='9876500001', first_name='Pizza', last_name='Shop')
+        for receiver, receiver_phone in [(friend, friend.phone_number), (None, '+919876500001'), (None, '+919876500002')]:
+            Interaction.objects.create(
+                initiator=self.user, receiver=receiver, receiver_phone=receiver_phone, interaction_type='call'
+            )
+
+        self.client = APIClient()
+        # A real token, so the JWT user lookup counts as it does in the budgets
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_dashboard_cache_miss(self):
+        with self.assertNumQueries(DashboardView.query_budget):
+            response = self.client.get('/api/dashboard', HTTP_ACCEPT='application/json')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['top_contacts']), 3)
+
+    def test_dashboard_cache_hit(self):
+        self.client.get('/api/dashboard', HTTP_ACCEPT='application/json')
+        # Only the JWT user lookup
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/dashboard', HTTP_ACCEPT='application/json')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_top_contacts(self):
+        with self.assertNumQueries(TopContactsView.query_budget):
+            response = self.client.get('/api/interactions/top')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {contact['contact_name'] for contact in response.data},
+            {'Priya Shah', 'Pizza Shop', '+919876500002'},
+        )
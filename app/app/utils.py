@@ -1,20 +1,126 @@
+import functools
+import heapq
+import itertools
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import phonenumbers
 from phonenumbers import NumberParseException
+from django.conf import settings
 from rest_framework.exceptions import ValidationError
+from app import metrics
 
 
-def normalize_phone_number(phone_number, default_region='IN'):
+_PHONE_SEPARATORS = str.maketrans('', '', ' -()')
+
+
+def normalize_phone_number(phone_number, default_region=None):
     """
     Normalize phone number to E.164 format (+919876543210)
     Handles formats: 9876543210, +919876543210, 919876543210
+    Results (including invalid inputs) are memoized per (cleaned input, region)
     """
     if not phone_number:
         raise ValidationError("Phone number is required")
     
+    started = time.perf_counter()
     # Clean the input - remove spaces, dashes, parentheses
-    phone_number = str(phone_number).strip()
-    phone_number = phone_number.replace(' ', '').replace('-', '').replace('(', '').replace(')', '')
+    phone_number = str(phone_number).strip().translate(_PHONE_SEPARATORS)
     
+    normalized, error = _normalize_cleaned_phone_number(
+        phone_number, default_region or settings.PHONENUMBER_DEFAULT_REGION
+    )
+    metrics.phone_normalization_duration.observe(time.perf_counter() - started)
+    metrics.phone_normalizations.inc(result='valid' if error is None else 'invalid')
+    if error is not None:
+        raise ValidationError(error)
+    return normalized
+
+
+@functools.lru_cache(maxsize=settings.PHONE_NORMALIZATION_CACHE_SIZE)
+def _normalize_cleaned_phone_number(phone_number, default_region):
+    """
+    Cached (normalized, None) or (None, error detail) for a cleaned number.
+    Errors are returned instead of raised so invalid inputs get cached too.
+    """
+    try:
+        return _parse_phone_number(phone_number, default_region), None
+    except ValidationError as e:
+        return None, e.detail
+
+
+def normalize_phone_numbers(phone_numbers, default_region=None, workers=None):
+    """
+    Batch version of normalize_phone_number that never raises per item.
+    Returns (normalized, errors): normalized is aligned with the input and holds
+    None for invalid entries, errors maps the index of each invalid entry to its message.
+    Every distinct number is parsed once; with `workers`, batches of at least
+    PHONE_BATCH_PARALLEL_THRESHOLD distinct numbers are parsed in a process pool.
+    """
+    region = default_region or settings.PHONENUMBER_DEFAULT_REGION
+    cleaned = [
+        str(phone_number).strip().translate(_PHONE_SEPARATORS) if phone_number else ''
+        for phone_number in phone_numbers
+    ]
+
+    unique = list(dict.fromkeys(phone_number for phone_number in cleaned if phone_number))
+    if workers and len(unique) >= settings.PHONE_BATCH_PARALLEL_THRESHOLD:
+        chunk_size = -(-len(unique) // workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = executor.map(
+                _normalize_phone_number_chunk,
+                [unique[start:start + chunk_size] for start in range(0, len(unique), chunk_size)],
+                itertools.repeat(region),
+            )
+            outcomes = dict(zip(unique, itertools.chain.from_iterable(chunks)))
+    else:
+        outcomes = {phone_number: _normalize_phone_number_outcome(phone_number, region) for phone_number in unique}
+
+    normalized = []
+    errors = {}
+    for index, phone_number in enumerate(cleaned):
+        if not phone_number:
+            normalized.append(None)
+            errors[index] = "Phone number is required"
+            continue
+        value, error = outcomes[phone_number]
+        normalized.append(value)
+        if error is not None:
+            errors[index] = error
+    return normalized, errors
+
+
+def _normalize_phone_number_outcome(phone_number, default_region):
+    normalized, error = _normalize_cleaned_phone_number(phone_number, default_region)
+    return normalized, (str(error[0]) if error is not None else None)
+
+
+def _normalize_phone_number_chunk(phone_numbers, default_region):
+    # Runs in pool workers, each with its own normalization cache
+    return [_normalize_phone_number_outcome(phone_number, default_region) for phone_number in phone_numbers]
+
+
+def phone_normalization_cache_info():
+    """Hits, misses and size of the normalize_phone_number cache"""
+    return _normalize_cleaned_phone_number.cache_info()
+
+
+def clear_phone_normalization_cache():
+    _normalize_cleaned_phone_number.cache_clear()
+
+
+def _collect_phone_normalization_cache_metrics():
+    info = _normalize_cleaned_phone_number.cache_info()
+    metrics.cache_requests.set_total(info.hits, cache='phone_normalization', result='hit')
+    metrics.cache_requests.set_total(info.misses, cache='phone_normalization', result='miss')
+
+
+metrics.REGISTRY.add_collector(_collect_phone_normalization_cache_metrics)
+
+
+def _parse_phone_number(phone_number, default_region):
     try:
         # Parse the number with default region
         parsed_number = phonenumbers.parse(phone_number, default_region)
@@ -38,5 +144,136 @@ def normalize_phone_number(phone_number, default_region='IN'):
         else:
             raise ValidationError(f"Invalid phone number format: '{phone_number}'. Please enter a valid 10-digit number.")
     
+    except ValidationError:
+        raise
+    
     except Exception as e:
-        raise ValidationError(f"Phone number error: {str(e)}")
\ No newline at end of file
+        raise ValidationError(f"Phone number error: {str(e)}")
+
+
+def normalize_name(name):
+    """
+    Lowercase a name, strip accents from Latin letters and collapse everything
+    that is not a letter, digit or mark into single spaces
+    ("  José  O'Neil" -> "jose o neil"). Letters of every script are kept,
+    and so are the vowel signs and viramas that words in Indic scripts need.
+    """
+    if not name:
+        return ''
+    chars = []
+    for char in unicodedata.normalize('NFKD', str(name).lower()):
+        if unicodedata.combining(char) and chars and chars[-1].isascii():
+            continue
+        chars.append(char if unicodedata.category(char)[0] in 'LNM' else ' ')
+    return ' '.join(''.join(chars).split())
+
+
+def name_trigrams(name):
+    """
+    Set of trigrams for a name, with every word padded like pg_trgm
+    ("  kumar " -> "  k", " ku", "kum", "uma", "mar", "ar ")
+    """
+    trigrams = set()
+    for word in normalize_name(name).split():
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+class TopMatches:
+    """
+    Bounded min-heap of the best `size` search results, one per phone number.
+    Results rank by (match_score, is_registered, phone_number), so on equal
+    scores a registered user beats a contact with the same number and the
+    order of the remaining ties is stable.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._best = {}
+        self._heap = []
+        self._counter = itertools.count()
+
+    @staticmethod
+    def rank(result):
+        return (result['match_score'], result['is_registered'], result['phone_number'])
+
+    def is_full(self):
+        return len(self._best) >= self.size
+
+    def min_rank(self):
+        """Rank a new result has to beat to get in, or None while there is room"""
+        if not self.is_full():
+            return None
+        self._drop_stale()
+        return self._heap[0][0]
+
+    def push(self, result):
+        phone = result['phone_number']
+        rank = self.rank(result)
+
+        current = self._best.get(phone)
+        if current is not None:
+            if rank <= self.rank(current):
+                return
+        elif self.is_full():
+            if rank <= self.min_rank():
+                return
+            evicted = heapq.heappop(self._heap)[2]
+            del self._best[evicted['phone_number']]
+
+        self._best[phone] = result
+        heapq.heappush(self._heap, (rank, next(self._counter), result))
+
+    def results(self):
+        """Kept results, best first"""
+        return sorted(self._best.values(), key=self.rank, reverse=True)
+
+    def _drop_stale(self):
+        # Entries of numbers that were since replaced by a better result
+        while self._heap and self._best.get(self._heap[0][2]['phone_number']) is not self._heap[0][2]:
+            heapq.heappop(self._heap)
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU with a per-entry timeout, for lookups too hot
+    for a round trip to the shared cache. Other processes never see its
+    invalidations, so the timeout bounds how stale an entry can get.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
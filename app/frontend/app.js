@@ -3,6 +3,9 @@ const API_URL = 'http://127.0.0.1:8000/api';
 
 // Global state
 let currentUser = null;
+// Spam stats shown so far, and the URL of their next page (null on the last page)
+let spamStats = [];
+let spamStatsNextUrl = null;
 
 // ============================================
 // INITIALIZATION
@@ -482,7 +485,7 @@ function showSuccessMessage(title, message) {
     }, 2000);
 }
 
-async function fetchWithAuth(url, options = {}) {
+async function fetchResponseWithAuth(url, options = {}) {
     const token = localStorage.getItem('access_token');
     
     if (!token) {
@@ -518,9 +521,37 @@ async function fetchWithAuth(url, options = {}) {
         throw new Error(error.error || 'Request failed');
     }
     
+    return response;
+}
+
+async function fetchWithAuth(url, options = {}) {
+    const response = await fetchResponseWithAuth(url, options);
     return response.json();
 }
 
+// One page of a paginated list, and the URL of the next page from its rel="next" Link header
+async function fetchPageWithAuth(url) {
+    const response = await fetchResponseWithAuth(url);
+    const items = await response.json();
+    
+    const match = (response.headers.get('Link') || '').match(/<([^>]+)>;\s*rel="next"/);
+    return { items, nextUrl: match ? match[1] : null };
+}
+
+// Every item of a paginated list, following the rel="next" Link header page by page
+async function fetchAllWithAuth(url) {
+    const items = [];
+    let nextUrl = url;
+    
+    while (nextUrl) {
+        const page = await fetchPageWithAuth(nextUrl);
+        items.push(...page.items);
+        nextUrl = page.nextUrl;
+    }
+    
+    return items;
+}
+
 function initializeApp() {
     console.log('Initializing app...');
     showPage('dashboardPage');
@@ -644,6 +675,13 @@ function formatDate(dateString) {
     return date.toLocaleDateString();
 }
 
+// YYYY-MM-DD of the user's local day, where toISOString() would give the UTC one
+function formatLocalDate(date) {
+    const month = String(date.getMonth() + 1).padStart(2, '0');
+    const day = String(date.getDate()).padStart(2, '0');
+    return `${date.getFullYear()}-${month}-${day}`;
+}
+
 function showDashboardError(message) {
     const container = document.querySelector('.container');
     if (container) {
@@ -745,7 +783,7 @@ async function loadContacts() {
     console.log('Loading contacts...');
     
     try {
-        const contacts = await fetchWithAuth(`${API_URL}/contact`);
+        const contacts = await fetchAllWithAuth(`${API_URL}/contact`);
         console.log('Contacts:', contacts);
         displayContacts(contacts);
         
@@ -861,14 +899,36 @@ async function loadSpamStats() {
     console.log('Loading spam stats...');
     
     try {
-        const stats = await fetchWithAuth(`${API_URL}/interactions/spam-stats`);
-        console.log('Spam stats:', stats);
-        displaySpamStats(stats);
+        await showSpamStats(`${API_URL}/interactions/spam-stats`);
     } catch (error) {
         console.error('Error loading spam stats:', error);
     }
 }
 
+// First page of the spam stats, further pages only when "Load more" is clicked
+async function showSpamStats(url) {
+    const page = await fetchPageWithAuth(url);
+    console.log('Spam stats:', page.items);
+    spamStats = page.items;
+    spamStatsNextUrl = page.nextUrl;
+    displaySpamStats(spamStats);
+}
+
+async function loadMoreSpamStats() {
+    if (!spamStatsNextUrl) {
+        return;
+    }
+    
+    try {
+        const page = await fetchPageWithAuth(spamStatsNextUrl);
+        spamStats = spamStats.concat(page.items);
+        spamStatsNextUrl = page.nextUrl;
+        displaySpamStats(spamStats);
+    } catch (error) {
+        console.error('Error loading more spam stats:', error);
+    }
+}
+
 function displaySpamStats(stats) {
     const container = document.getElementById('spamStatsList');
     
@@ -889,6 +949,11 @@ function displaySpamStats(stats) {
             </div>
         </div>
     `).join('');
+    
+    if (spamStatsNextUrl) {
+        container.insertAdjacentHTML('beforeend', '<button type="button" class="btn-primary" id="spamStatsMore">Load more</button>');
+        document.getElementById('spamStatsMore').addEventListener('click', loadMoreSpamStats);
+    }
 }
 
 async function handleReportSpam(e) {
@@ -965,7 +1030,8 @@ async function applySpamFilters() {
         }
         
         if (startDate) {
-            params.push(`start_date=${startDate.toISOString()}`);
+            // Whole local days (YYYY-MM-DD) are answered from the spam leaderboard
+            params.push(`start_date=${formatLocalDate(startDate)}`);
         }
     }
     
@@ -974,9 +1040,7 @@ async function applySpamFilters() {
     }
     
     try {
-        const stats = await fetchWithAuth(url);
-        console.log('Filtered spam stats:', stats);
-        displaySpamStats(stats);
+        await showSpamStats(url);
     } catch (error) {
         console.error('Error loading filtered spam stats:', error);
     }